@@ -0,0 +1,44 @@
+import argparse
+import time
+
+from iliq.dir_tree import DirTree
+
+
+_EDGE_STATEMENTS = ['\nCREATE UNIQUE INDEX ix ON s.t(a);',
+                    '\nCREATE TABLE IF NOT EXISTS s.t (a int);',
+                    '\nCREATE OR REPLACE FUNCTION s.f() returns int;',
+                    '\nCOMMENT ON COLUMN s.t.c IS \'x\';',
+                    '\nALTER TABLE s.t ADD CONSTRAINT c UNIQUE (a);',
+                    '\nCREATE SEQUENCE s.q START 1;',
+                    '\nCREATE SEQUENCE IF NOT EXISTS s.q;',
+                    '\nCOMMENT ON VIEW s.v IS \'a\';',
+                    '\ncreate table "My Schema"."t 1" (a int);']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures DirTree.classify_ddl throughput, '
+                                                 'run from the repository root: python -m benchmarks.bench_classify_ddl')
+    parser.add_argument('dump', help='SQL dump, e.g. one written by gen_ddl_dump.py')
+    parser.add_argument('--big-lines', type=int, default=10000,
+                        help='line count of the large CREATE FUNCTION statement')
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    statements = list(DirTree.parse_ddl_file(args.dump, use_mmap=True)) + _EDGE_STATEMENTS
+    started = time.perf_counter()
+    for statement in statements:
+        DirTree.classify_ddl(statement)
+    elapsed = time.perf_counter() - started
+    print(f'{len(statements)} dump statements: {len(statements) / elapsed / 1000:.0f}k statements/s')
+
+    big_function = ('\nCREATE OR REPLACE FUNCTION s.big() RETURNS int AS $$\n' +
+                    'select 1;\n' * args.big_lines + '$$;')
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        DirTree.classify_ddl(big_function)
+    elapsed = time.perf_counter() - started
+    print(f'{args.big_lines}-line CREATE FUNCTION: {elapsed / args.repeat * 1e6:.1f} us per statement')
+
+
+if __name__ == '__main__':
+    main()
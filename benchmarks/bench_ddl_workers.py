@@ -0,0 +1,82 @@
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from iliq.ddl_parser import iter_ddl_chunks, open_ddl_mmap
+from iliq.dir_tree import DirTree
+
+
+class DumpOnlyDriver:
+    rdbms_type = 'postgresql'
+    db_name = 'bench'
+
+    def __init__(self, schemas: int):
+        self.schemas = [f's{i}' for i in range(schemas)]
+
+    def get_all_schemas(self):
+        return self.schemas
+
+
+def tree_digests(path: str):
+    digests = {}
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            with open(file_path, 'rb') as f:
+                digests[os.path.relpath(file_path, path)] = hashlib.sha1(f.read()).hexdigest()
+
+    return digests
+
+
+def build_tree(path: str, dump: str, schemas: int, workers: int):
+    dir_tree = DirTree(DumpOnlyDriver(schemas), path, ddl_workers=workers)
+    dir_tree.create_dir_tree(recreate=True)
+    started = time.perf_counter()
+    if workers > 1:
+        # bypasses the cpu count cap of put_ddl_file_into_tree to measure the parallel path itself
+        object_recs = list(dir_tree.put_ddl_file_into_tree_parallel(dump, workers=workers))
+    else:
+        object_recs = list(dir_tree.put_ddl_file_into_tree(dump, use_mmap=True, workers=1))
+
+    return object_recs, time.perf_counter() - started
+
+
+def prescan(dump: str):
+    with open(dump, 'rb') as sql_f:
+        with open_ddl_mmap(sql_f) as buf:
+            started = time.perf_counter()
+            chunks = list(iter_ddl_chunks(buf))
+            return len(chunks), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares serial and parallel dump processing, '
+                                                 'run from the repository root: python -m benchmarks.bench_ddl_workers')
+    parser.add_argument('dump', help='SQL dump, e.g. one written by gen_ddl_dump.py')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4])
+    parser.add_argument('--schemas', type=int, default=40)
+    args = parser.parse_args()
+
+    print(f'{os.cpu_count()} CPUs')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        base_recs, base_elapsed = build_tree(os.path.join(tmp_dir, 'serial'), args.dump, args.schemas, 1)
+        base_digests = tree_digests(os.path.join(tmp_dir, 'serial'))
+        print(f'serial: {len(base_recs)} objects in {base_elapsed:.2f}s')
+
+        # the parent scans statement boundaries alone before any worker starts
+        chunks, prescan_elapsed = prescan(args.dump)
+        print(f'prescan: {chunks} chunks in {prescan_elapsed:.2f}s, '
+              f'speedup bound {base_elapsed / prescan_elapsed:.1f}x')
+
+        for workers in args.workers:
+            path = os.path.join(tmp_dir, f'workers_{workers}')
+            object_recs, elapsed = build_tree(path, args.dump, args.schemas, workers)
+            same = object_recs == base_recs and tree_digests(path) == base_digests
+            print(f'{workers} workers: {elapsed:.2f}s, speedup {base_elapsed / elapsed:.2f}x, '
+                  f'{"same" if same else "DIFFERENT"} output')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import os
+import time
+
+import oracledb
+
+from iliq.oracle_access import OracleSQLAccess
+from iliq.sql_commands import OracleSQLCommands
+
+
+_QUERIES = {'views_routines_triggers': (OracleSQLCommands.views_routines_triggers_select,
+                                        'get_views_routines_triggers'),
+            'routines': (OracleSQLCommands.routines_text_select, 'get_all_procedures'),
+            'triggers': (OracleSQLCommands.triggers_text_select, 'get_all_triggers'),
+            'materialized_views': (OracleSQLCommands.materialized_views_select, 'get_all_mat_views'),
+            'composite_types': (OracleSQLCommands.object_types_select, 'get_all_composite_types')}
+
+
+def fetch_with_lob_locators(driver: OracleSQLAccess, query: str):
+    # the driver before the change: default array sizes, one extra round trip per CLOB
+    conn = oracledb.connect(user=driver.user_name, password=driver.password, params=driver.conn_str)
+    try:
+        with conn.cursor() as cur:
+            cur.arraysize = 100
+            cur.prefetchrows = 101
+            started = time.perf_counter()
+            cur.execute(_QUERIES[query][0].value, {'schema_name': None})
+            objects = 0
+            for row in cur:
+                for value in row:
+                    if isinstance(value, oracledb.LOB):
+                        value.read()
+                objects += 1
+            return objects, time.perf_counter() - started
+    finally:
+        conn.close()
+
+
+def fetch_with_driver(driver: OracleSQLAccess, query: str):
+    driver.connect()
+    started = time.perf_counter()
+    objects = sum(1 for _ in getattr(driver, _QUERIES[query][1])())
+    elapsed = time.perf_counter() - started
+    driver.close_conn()
+    return objects, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares Oracle catalog fetch with LOB locators and with the '
+                                                 'driver settings, run from the repository root: '
+                                                 'python -m benchmarks.bench_oracle_fetch')
+    parser.add_argument('--user', default=os.environ.get('ILIQ_P_USERNAME'))
+    parser.add_argument('--password', default=os.environ.get('ILIQ_P_PASSWORD'))
+    parser.add_argument('--service', default=os.environ.get('ILIQ_P_DB_NAME', 'FREEPDB1'))
+    parser.add_argument('--host', default=os.environ.get('ILIQ_P_HOST', 'localhost'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('ILIQ_P_PORT', 1521)))
+    parser.add_argument('--query', choices=sorted(_QUERIES), default='views_routines_triggers')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    driver = OracleSQLAccess(args.user, args.password, args.service, args.host, args.port)
+    for name, fetch in (('lob locators', fetch_with_lob_locators), ('driver', fetch_with_driver)):
+        best = None
+        for _ in range(args.repeat):
+            objects, elapsed = fetch(driver, args.query)
+            best = elapsed if best is None else min(best, elapsed)
+        print(f'{name}: {objects} objects, best of {args.repeat} {best:.2f}s, '
+              f'{objects / best if best else 0:.0f} objects/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import argparse
+
+
+def write_dump(path: str, target_size: int, schemas=40):
+    with open(path, 'w') as f:
+        f.write('-- liquibase formatted sql\n\n')
+        n = size = 0
+        while size < target_size:
+            s = n % schemas
+            chunk = [f'-- changeset gen:{n}-1\n',
+                     f'CREATE TABLE "s{s}"."t{n}" (id INTEGER NOT NULL, name VARCHAR(50) DEFAULT \'a;b\', '
+                     f'CONSTRAINT "t{n}_pkey" PRIMARY KEY (id));\n\n',
+                     f'-- changeset gen:{n}-2\n',
+                     f'COMMENT ON TABLE s{s}.t{n} IS \'multi\nline; comment -- not a comment\n\';\n\n',
+                     f'CREATE INDEX idx_{n} ON s{s}.t{n}(name);\n\n',
+                     f'ALTER TABLE s{s}.t{n} ADD CONSTRAINT fk_{n} FOREIGN KEY (id) REFERENCES s{s}.t0 (id);\n\n']
+            if n % 500 == 0:
+                chunk.append(f'CREATE TABLE s0.big{n} (\n' +
+                             ''.join(f'  c{i} varchar(10) default \'x{i}\',\n' for i in range(3000)) +
+                             '  z int);\n\n')
+            chunk = ''.join(chunk)
+            f.write(chunk)
+            size += len(chunk)
+            n += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Writes a synthetic generate-changelog style SQL dump, '
+                                                 'run from the repository root: python -m benchmarks.gen_ddl_dump')
+    parser.add_argument('path')
+    parser.add_argument('--size-mb', type=int, default=30)
+    parser.add_argument('--schemas', type=int, default=40)
+    args = parser.parse_args()
+
+    write_dump(args.path, args.size_mb * 1024 * 1024, args.schemas)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,4 @@
 import os.path
-import pprint
 import json
 from copy import deepcopy
 
@@ -50,6 +49,8 @@ _MAIN_LOG_TEMPLATE = {
 
 
 def pretty_json(obj: dict | list) -> str:
+    import pprint
+
     obj = pprint.pformat(obj, width=140, sort_dicts=False)
     obj = (obj.replace('\'', '"').
            replace('True', 'true').
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import re
+
+
+_CHECKSUM_VERSION = 8
+_SQL_WHITESPACE_PATTERN = re.compile(rb'[ \t\r\n]+')
+_LEGACY_NONE_PATTERN = re.compile(r': None(?=\s*[,}\]])')
+
+CHANGE_SET_STATUSES = ('pending', 'changed', 'always', 'mismatched', 'ran', 'filtered')
+
+
+def load_changelog_json(data: str):
+    # pretty_json renders missing rollback paths as None, which Liquibase's YAML based
+    # JSON parser accepts but json does not
+    if 'None' in data:
+        data = _LEGACY_NONE_PATTERN.sub(': null', data)
+
+    return json.loads(data)
+
+
+def normalize_changelog_path(path: str):
+    if not path.startswith(('.', '/', 'classpath:')) and '\\' not in path:
+        return path
+
+    path = path.replace('\\', '/')
+    if path.startswith('classpath:'):
+        path = path[len('classpath:'):]
+    while path.startswith('./'):
+        path = path[2:]
+
+    return path.lstrip('/')
+
+
+def liquibase_bool(value, default: bool):
+    if value is None:
+        value = default
+    if isinstance(value, str):
+        value = value.lower() == 'true'
+
+    return 'true' if value else 'false'
+
+
+def sql_file_checksum(sql: bytes,
+                      end_delimiter=None,
+                      split_statements=None,
+                      strip_comments=None):
+    # Liquibase concatenates a missing delimiter as Java null
+    end_delimiter = 'null' if end_delimiter is None else end_delimiter
+    header = f'{end_delimiter}:{liquibase_bool(split_statements, True)}:{liquibase_bool(strip_comments, False)}:'
+    if b'\x0b' in sql or b'\x0c' in sql:
+        sql = _SQL_WHITESPACE_PATTERN.sub(b' ', sql).strip(b' ')
+    else:
+        sql = b' '.join(sql.split())
+    return hashlib.md5(header.encode('utf-8') + sql).hexdigest()
+
+
+def change_set_checksum(change_checksums: list):
+    value = ''.join(f'{_CHECKSUM_VERSION}:{checksum}:' for checksum in change_checksums)
+    return f'{_CHECKSUM_VERSION}:{hashlib.md5(value.encode("utf-8")).hexdigest()}'
+
+
+def load_changelog(parent_path: str,
+                   changelog_file: str,
+                   encoding='utf-8',
+                   state=None):
+    if state is not None:
+        return state.document(changelog_file, load_changelog_json, encoding)
+
+    with open(os.path.join(parent_path, changelog_file), 'r', encoding=encoding) as f:
+        return load_changelog_json(f.read())
+
+
+def iter_change_sets(parent_path: str,
+                     changelog_file: str,
+                     encoding='utf-8',
+                     state=None):
+    change_log = load_changelog(parent_path, changelog_file, encoding, state)
+
+    for entry in change_log.get('databaseChangeLog') or []:
+        if 'include' in entry:
+            include_file = entry['include']['file']
+            if entry['include'].get('relativeToChangelogFile'):
+                include_file = os.path.join(os.path.dirname(changelog_file), include_file)
+            yield from iter_change_sets(parent_path, include_file, encoding, state)
+        elif 'changeSet' in entry:
+            yield changelog_file, entry['changeSet']
+
+
+class ChangeSetChecksums:
+
+    def __init__(self, parent_path: str, state=None):
+        self.parent_path = parent_path
+        self.state = state
+        self.sql_checksums = {}
+
+    def sql_file_checksum(self, changelog_file: str, sql_file: dict):
+        path = sql_file['path']
+        if sql_file.get('relativeToChangelogFile'):
+            path = os.path.join(os.path.dirname(changelog_file), path)
+        key = (path, sql_file.get('endDelimiter'), sql_file.get('splitStatements'), sql_file.get('stripComments'))
+
+        checksum = self.sql_checksums.get(key)
+        if checksum is None:
+            if self.state is not None:
+                checksum = self.state.checksum(path,
+                                               repr(key[1:]),
+                                               lambda sql: sql_file_checksum(sql, *key[1:]))
+            else:
+                with open(os.path.join(self.parent_path, path), 'rb') as f:
+                    checksum = sql_file_checksum(f.read(), *key[1:])
+            self.sql_checksums[key] = checksum
+
+        return checksum
+
+    def change_set_checksum(self, changelog_file: str, change_set: dict):
+        change_checksums = []
+        for change in change_set.get('changes') or []:
+            if 'sqlFile' not in change:
+                return None
+            change_checksums.append(self.sql_file_checksum(changelog_file, change['sqlFile']))
+
+        return change_set_checksum(change_checksums)
+
+
+def change_set_selected(change_set: dict, rdbms_type: str, contexts: list = None):
+    dbms = change_set.get('dbms')
+    if dbms and rdbms_type not in [d.strip() for d in dbms.split(',')]:
+        return False
+
+    context = change_set.get('context') or change_set.get('contextFilter')
+    if contexts and context:
+        return bool({c.strip() for c in context.split(',')} & set(contexts))
+
+    return True
+
+
+def get_change_log_status(parent_path: str,
+                          changelog_file: str,
+                          applied_rows: list,
+                          rdbms_type: str,
+                          contexts: list = None,
+                          encoding='utf-8',
+                          state=None):
+    applied = {(change_set_id, author, normalize_changelog_path(filename)): md5sum
+               for change_set_id, author, filename, md5sum in applied_rows}
+    checksums = ChangeSetChecksums(parent_path, state)
+    status = {s: [] for s in CHANGE_SET_STATUSES}
+
+    for changelog_path, change_set in iter_change_sets(parent_path, changelog_file, encoding, state):
+        filename = normalize_changelog_path(changelog_path)
+        key = (change_set['id'], change_set['author'], filename)
+
+        if not change_set_selected(change_set, rdbms_type, contexts):
+            status['filtered'].append(key)
+            continue
+
+        if key not in applied:
+            status['pending'].append(key)
+            continue
+
+        if liquibase_bool(change_set.get('runAlways'), False) == 'true':
+            status['always'].append(key)
+            continue
+
+        stored = applied[key]
+        if not stored or not stored.startswith(f'{_CHECKSUM_VERSION}:'):
+            status['ran'].append(key)
+            continue
+
+        checksum = checksums.change_set_checksum(changelog_path, change_set)
+        if checksum is None or checksum == stored:
+            status['ran'].append(key)
+        elif liquibase_bool(change_set.get('runOnChange'), False) == 'true':
+            status['changed'].append(key)
+        else:
+            status['mismatched'].append(key)
+
+    return status
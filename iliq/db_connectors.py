@@ -1,12 +1,15 @@
 import os
-import psycopg
-from psycopg.rows import dict_row
-
-import oracledb
+import time
 
 from enum import Enum
+from contextlib import contextmanager
 from abc import ABC, abstractmethod
-from .sql_commands import PostgreSQLCommands, OracleSQLCommands
+
+
+_DRIVER_MODULES = {'PostgreSQLAccess': 'postgresql_access',
+                   'OracleSQLAccess': 'oracle_access'}
+
+_SCHEMA_QUEUE_DEPTH = 2
 
 
 class RDBMSTypes(Enum):
@@ -29,6 +32,13 @@ class DBAccess(ABC):
         self.db_name = None
         self.host = None
         self.port = None
+        self.extract_workers = 1
+        self.pool_min_size = 0
+        self.pool_max_size = 0
+        self.pool = None
+        self.pool_stats = None
+        self.batch_size = 1000
+        self.batch_stats = None
         self.conn = None
 
     def __str__(self):
@@ -39,337 +49,421 @@ class DBAccess(ABC):
         return bool(self.conn)
 
     @property
-    def sql_sep(self):
-        return RDBMSTypes[self.rdbms_type].sql_sep
+    def pooled(self):
+        return self.pool_max_size > 0
 
     @abstractmethod
-    def get_all_schemas(self):
-        ...
-
-    @abstractmethod
-    def get_all_procedures(self):
-        ...
-
-    @abstractmethod
-    def get_all_triggers(self):
-        ...
-
-    @abstractmethod
-    def get_all_mat_views(self):
-        ...
-
-    @abstractmethod
-    def get_all_composite_types(self):
-        ...
-
-    @abstractmethod
-    def get_views_routines_triggers(self):
+    def connect(self):
         ...
 
     @abstractmethod
-    def delete_change_set(self):
+    def open_pool(self):
         ...
 
     @abstractmethod
-    def truncate_change_log(self):
+    def pool_connection(self):
         ...
 
     @abstractmethod
-    def execute_any_sql(self, cmd: str):
+    def connection_healthy(self, conn) -> bool:
         ...
 
-
-class PostgreSQLAccess(DBAccess):
-
-    SQL = PostgreSQLCommands
-
-    def __init__(self,
-                 user_name: str,
-                 password: str,
-                 db_name: str,
-                 host: str,
-                 port=5432):
-        self.rdbms_type = RDBMSTypes.postgresql.name
-        self.user_name = user_name
-        self.password = password
-        self.db_name = db_name
-        self.host = host
-        self.port = port
-        self.conn: psycopg.Connection = None
-
-    @property
-    def conn_str(self):
-        return 'host={} port={} dbname={} user={} password={}'.format(self.host,
-                                                                      self.port,
-                                                                      self.db_name,
-                                                                      self.user_name,
-                                                                      self.password)
-
-    def connect(self):
-        if not self.conn:
-            self.conn = psycopg.connect(self.conn_str)
-
     def close_conn(self):
         if self.conn:
             self.conn.close()
             self.conn = None
 
-    def get_all_schemas(self):
-        if not self.connected:
-            self.connect()
-
-        with self.conn.cursor() as cur:
-            cur.execute(self.SQL.schema_list_select.value, (None,))
-            schemas = [r[0] for r in cur.fetchall()]
-
-        return schemas
-
-    def get_schema(self, schema_name):
-        if not self.connected:
-            self.connect()
-
-        with self.conn.cursor() as cur:
-            cur.execute(self.SQL.schema_list_select.value, (schema_name,))
-            schema = cur.fetchone()[0]
-
-        return schema
-
-    def get_all_procedures(self):
-        if not self.connected:
-            self.connect()
-
-        with self.conn.cursor(row_factory=dict_row) as cur:
-            cur.execute(self.SQL.routines_text_select.value, (None,))
-            for line in cur:
-                yield line
-
-    def get_all_triggers(self):
-        if not self.connected:
-            self.connect()
-
-        with self.conn.cursor(row_factory=dict_row) as cur:
-            cur.execute(self.SQL.triggers_text_select.value, (None,))
-            for line in cur:
-                yield line
-
-    def get_all_mat_views(self):
-        if not self.connected:
-            self.connect()
-
-        with self.conn.cursor(row_factory=dict_row) as cur:
-            cur.execute(self.SQL.materialized_views_select.value, (None,))
-            for line in cur:
-                yield line
-
-    def get_all_composite_types(self):
-        if not self.connected:
-            self.connect()
-
-        with self.conn.cursor(row_factory=dict_row) as cur:
-            cur.execute(self.SQL.object_types_select.value, (None,))
-            for line in cur:
-                yield line
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def count_checkout(self, started: float):
+        wait = time.perf_counter() - started
+        self.pool_stats['checkouts'] += 1
+        self.pool_stats['wait'] += wait
+        self.pool_stats['max_wait'] = max(self.pool_stats['max_wait'], wait)
+
+    @contextmanager
+    def connection(self):
+        started = time.perf_counter()
+
+        if self.pooled:
+            if self.pool is None:
+                self.pool = self.open_pool()
+
+            with self.pool_connection() as conn:
+                self.count_checkout(started)
+                yield conn
+            return
+
+        if self.conn is not None and not self.connection_healthy(self.conn):
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+            self.pool_stats['reconnects'] += 1
 
-    def get_views_routines_triggers(self):
         if not self.connected:
             self.connect()
 
-        with self.conn.cursor(row_factory=dict_row) as cur:
-            cur.execute(self.SQL.views_routines_triggers_select.value, (None,))
-            for line in cur:
-                yield line
+        self.count_checkout(started)
+        yield self.conn
 
-    def delete_change_set(self,
-                          change_set_id: str,
-                          change_log_schema: str = 'public'):
-        if not self.connected:
-            self.connect()
+    @abstractmethod
+    def bind_marker(self, position: int) -> str:
+        ...
 
-        if not change_set_id:
-            raise ValueError
+    def inline_sql(self, sql: str) -> str:
+        return sql
 
-        with self.conn.cursor() as cur:
-            sql_cmd = self.SQL.databasechangelog_delete.value.format(schema_name=change_log_schema)
-            cur.execute(sql_cmd,
-                        (change_set_id,))
+    def insert_sql(self, table: str, columns: str, shape: tuple):
+        values = []
+        position = 0
+        for expression in shape:
+            if expression is None:
+                values.append(self.bind_marker(position))
+                position += 1
+            else:
+                values.append(self.inline_sql(expression))
 
-        self.conn.commit()
+        return f'insert into {table} ({columns}) values ({", ".join(values)})'
 
-    def truncate_change_log(self, change_log_schema: str = 'public'):
-        if not self.connected:
-            self.connect()
+    def get_change_log_keys(self, table_name: str, conn=None):
+        if conn is None:
+            with self.connection() as conn:
+                return self.get_change_log_keys(table_name, conn)
 
-        with self.conn.cursor() as cur:
-            sql_cmd = self.SQL.databasechangelog_delete.value.format(schema_name=change_log_schema)
-            cur.execute(sql_cmd,
-                        (None,))
+        with conn.cursor() as cur:
+            cur.execute(self.SQL.databasechangelog_keys_select.value.format(table_name=table_name))
+            keys = set(cur.fetchall())
 
-        self.conn.commit()
+        return keys
 
-    def execute_any_sql(self, sql, *params, commit=True):
-        if not self.connected:
-            self.connect()
+    def get_change_log_rows(self, table_name: str):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(self.SQL.databasechangelog_state_select.value.format(table_name=table_name))
+                rows = cur.fetchall()
 
-        with self.conn.cursor() as cur:
-            cur.execute(sql, params)
+        return rows
 
-        if commit:
-            self.conn.commit()
+    @abstractmethod
+    def run_batch(self, conn, statements: list):
+        ...
 
+    def commit_batch(self, conn, statements: list, statements_count: int, commit=True):
+        started = time.perf_counter()
+        try:
+            self.run_batch(conn, statements)
+            if commit:
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        self.batch_stats['batches'] += 1
+        self.batch_stats['statements'] += statements_count
+        self.batch_stats['time'] += time.perf_counter() - started
+
+    def execute_many_sql(self, sql: str, rows, batch_size: int = None):
+        with self.batch(batch_size) as batch:
+            for params in rows:
+                batch.execute(sql, *params)
+
+    @contextmanager
+    def batch(self, batch_size: int = None, commit_batches=True):
+        with self.connection() as conn:
+            sql_batch = SQLBatch(self, conn, batch_size or self.batch_size, commit_batches)
+            try:
+                yield sql_batch
+            except Exception:
+                conn.rollback()
+                raise
+
+            sql_batch.flush()
+            if not commit_batches:
+                conn.commit()
+
+    def format_pool_stats(self):
+        stats = self.pool_stats
+        mode = f'pool {self.pool_min_size}..{self.pool_max_size}' if self.pooled else 'single connection'
+        avg_wait = stats['wait'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        return (f'{self.db_name} ({mode}): {stats["checkouts"]} checkouts, '
+                f'avg wait {avg_wait * 1000:.1f}ms, max wait {stats["max_wait"] * 1000:.1f}ms, '
+                f'{stats["reconnects"]} reconnects ({stats["reconnect_failures"]} failed)')
+
+    def format_batch_stats(self):
+        stats = self.batch_stats
+        rate = stats['statements'] / stats['time'] if stats['time'] else 0.0
+        return (f'{self.db_name}: {stats["statements"]} statements in {stats["batches"]} batches '
+                f'of up to {self.batch_size}, {stats["time"]:.2f}s ({rate:.0f} statements/s)')
 
-class OracleSQLAccess(DBAccess):
+    @property
+    def sql_sep(self):
+        return RDBMSTypes[self.rdbms_type].sql_sep
 
-    SQL = OracleSQLCommands
+    @abstractmethod
+    def select_rows(self, sql: str, params=None):
+        ...
 
-    def __init__(self,
-                 user_name: str,
-                 password: str,
-                 db_name: str,  #  service_name
-                 host: str,
-                 port=1521):
-        self.rdbms_type = RDBMSTypes.oracle.name
-        self.user_name = user_name
-        self.password = password
-        self.db_name = db_name
-        self.host = host
-        self.port = port
-        self.conn: oracledb.Connection = None
+    @abstractmethod
+    async def connect_async(self):
+        ...
 
-    @staticmethod
-    def set_row_factory(cursor: oracledb.Cursor):
-        columns = [col[0] for col in cursor.description]
-        cursor.rowfactory = lambda *args: dict(zip(columns, args))
-        return cursor
+    @abstractmethod
+    def select_batches_async(self, conn, sql: str, params=None):
+        ...
 
-    @property
-    def conn_str(self):
-        return oracledb.ConnectParams(host=self.host, port=self.port, service_name=self.db_name)
+    async def extract_schemas(self,
+                              sql: str,
+                              schemas: list,
+                              queues: list,
+                              spill_when_blocked=False):
+        import asyncio
+
+        connections = asyncio.Queue()
+        for _ in range(self.extract_workers):
+            connections.put_nowait(None)
+
+        opened = []
+        waiting = [len(schemas)]
+
+        async def extract_schema(schema, rows_queue):
+            conn = await connections.get()
+            waiting[0] -= 1
+            spill_f = error = None
+            try:
+                if conn is None:
+                    conn = await self.connect_async()
+                    opened.append(conn)
+
+                async for batch in self.select_batches_async(conn, sql, {'schema_name': schema}):
+                    # holding the connection on a full queue would starve schemas the merge still needs
+                    if spill_f is None and spill_when_blocked and waiting[0] and rows_queue.full():
+                        spill_f = open_spill_file()
+                    if spill_f is None:
+                        await rows_queue.put(batch)
+                    else:
+                        spill_batch(spill_f, batch)
+
+                await conn.commit()
+            except Exception as e:
+                error = e
+            finally:
+                connections.put_nowait(conn)
+
+            if error is not None:
+                if spill_f is not None:
+                    spill_f.close()
+                await rows_queue.put(error)
+                return
+
+            if spill_f is not None:
+                await rows_queue.put(spill_f)
+            await rows_queue.put(None)
+
+        try:
+            await asyncio.gather(*(extract_schema(schema, rows_queue)
+                                   for schema, rows_queue in zip(schemas, queues)))
+        finally:
+            for conn in opened:
+                await conn.close()
+
+    def select_rows_by_schema(self, sql: str, order_by: tuple = None):
+        if self.extract_workers <= 1:
+            yield from self.select_rows(sql, {'schema_name': None})
+            return
+
+        import asyncio
+        import heapq
+        import threading
+        from operator import itemgetter
+
+        schemas = self.get_all_schemas()
+        loop = asyncio.new_event_loop()
+        loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+        loop_thread.start()
+
+        async def start_extraction():
+            # a schema that fills its queue while others wait for a connection spills the rest to disk
+            queues = [asyncio.Queue(maxsize=_SCHEMA_QUEUE_DEPTH) for _ in schemas]
+            return queues, asyncio.create_task(self.extract_schemas(sql, schemas, queues, bool(order_by)))
+
+        def iter_schema_rows(rows_queue):
+            while True:
+                batch = asyncio.run_coroutine_threadsafe(rows_queue.get(), loop).result()
+                if batch is None:
+                    return
+                if isinstance(batch, Exception):
+                    raise batch
+                if isinstance(batch, list):
+                    yield from batch
+                else:
+                    with batch:
+                        yield from iter_spilled_rows(batch)
+
+        extraction = None
+        try:
+            queues, extraction = asyncio.run_coroutine_threadsafe(start_extraction(), loop).result()
+            streams = [iter_schema_rows(rows_queue) for rows_queue in queues]
+            if order_by:
+                yield from heapq.merge(*streams, key=itemgetter(*order_by))
+            else:
+                for stream in streams:
+                    yield from stream
+        finally:
+            if extraction is not None:
+                loop.call_soon_threadsafe(extraction.cancel)
+                asyncio.run_coroutine_threadsafe(asyncio.wait([extraction]), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join()
+            loop.close()
 
-    def connect(self):
-        if not self.connected:
-            self.conn = oracledb.connect(user=self.user_name,
-                                         password=self.password,
-                                         params=self.conn_str)
+    @abstractmethod
+    def get_all_schemas(self):
+        ...
 
-    def close_conn(self):
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+    @abstractmethod
+    def get_all_procedures(self):
+        ...
 
-    def get_all_schemas(self):
-        if not self.connected:
-            self.connect()
+    @abstractmethod
+    def get_all_triggers(self):
+        ...
 
-        with self.conn.cursor() as cur:
-            cur.execute(self.SQL.schema_list_select.value, (None,))
-            schemas = [r[0] for r in cur.fetchall()]
+    @abstractmethod
+    def get_all_mat_views(self):
+        ...
 
-        return schemas
+    @abstractmethod
+    def get_all_composite_types(self):
+        ...
 
-    def get_schema(self, schema_name):
-        if not self.connected:
-            self.connect()
+    @abstractmethod
+    def get_views_routines_triggers(self):
+        ...
 
-        with self.conn.cursor() as cur:
-            cur.execute(self.SQL.schema_list_select.value, (schema_name,))
-            schema = cur.fetchone()[0]
+    @abstractmethod
+    def get_native_ddl(self):
+        ...
 
-        return schema
+    @abstractmethod
+    def get_fingerprints(self):
+        ...
 
-    def get_all_procedures(self):
-        if not self.connected:
-            self.connect()
+    @abstractmethod
+    def get_objects_by_keys(self, object_keys: list):
+        ...
 
-        with self.conn.cursor() as cur:
+    @abstractmethod
+    def delete_change_set(self):
+        ...
 
-            cur = self.set_row_factory(cur)
-            cur.execute(self.SQL.routines_text_select.value, (None,))
-            for line in cur:
-                yield line
+    @abstractmethod
+    def delete_change_sets(self, change_set_ids: list):
+        ...
 
-    def get_all_triggers(self):
-        if not self.connected:
-            self.connect()
+    @abstractmethod
+    def truncate_change_log(self):
+        ...
 
-        with self.conn.cursor() as cur:
-            cur = self.set_row_factory(cur)
-            cur.execute(self.SQL.triggers_text_select.value, (None,))
-            for line in cur:
-                yield line
+    @abstractmethod
+    def execute_any_sql(self, cmd: str):
+        ...
 
-    def get_all_mat_views(self):
-        if not self.connected:
-            self.connect()
 
-        with self.conn.cursor() as cur:
-            cur = self.set_row_factory(cur)
-            cur.execute(self.SQL.materialized_views_select.value, (None,))
-            for line in cur:
-                yield line
+def open_spill_file():
+    import tempfile
 
-    def get_all_composite_types(self):
-        if not self.connected:
-            self.connect()
+    return tempfile.TemporaryFile()
 
-        with self.conn.cursor() as cur:
-            cur = self.set_row_factory(cur)
-            cur.execute(self.SQL.object_types_select.value, (None,))
-            for line in cur:
-                yield line
 
-    def get_views_routines_triggers(self):
-        if not self.connected:
-            self.connect()
+def spill_batch(spill_f, batch: list):
+    import pickle
 
-        with self.conn.cursor() as cur:
-            cur = self.set_row_factory(cur)
-            cur.execute(self.SQL.views_routines_triggers_select.value, (None,))
-            for line in cur:
-                yield line
+    pickle.dump(batch, spill_f, pickle.HIGHEST_PROTOCOL)
 
-    def delete_change_set(self,
-                          change_set_id: str,
-                          change_log_schema: str):
-        if not self.connected:
-            self.connect()
 
-        if not change_set_id:
-            raise ValueError
+def iter_spilled_rows(spill_f):
+    import pickle
 
-        with self.conn.cursor() as cur:
-            sql_cmd = self.SQL.databasechangelog_delete.value.format(schema_name=change_log_schema)
-            cur.execute(sql_cmd, (change_set_id,))
+    spill_f.seek(0)
+    while True:
+        try:
+            batch = pickle.load(spill_f)
+        except EOFError:
+            return
+        yield from batch
 
-        self.conn.commit()
 
-    def truncate_change_log(self, change_log_schema: str):
-        if not self.connected:
-            self.connect()
+class SQLBatch:
 
-        with self.conn.cursor() as cur:
-            sql_cmd = self.SQL.databasechangelog_delete.value.format(schema_name=change_log_schema)
-            cur.execute(sql_cmd,
-                        (None,))
+    def __init__(self, db_driver: DBAccess, conn, batch_size: int, commit_batches=True):
+        self.db_driver = db_driver
+        self.conn = conn
+        self.batch_size = batch_size
+        self.commit_batches = commit_batches
+        self.statements = []
+        self.pending = 0
 
-        self.conn.commit()
+    def execute(self, sql: str, *params):
+        if not params:
+            self.statements.append((sql, None))
+        elif self.statements and self.statements[-1][0] == sql and self.statements[-1][1] is not None:
+            self.statements[-1][1].append(params)
+        else:
+            self.statements.append((sql, [params]))
 
-    def execute_any_sql(self, sql: str, *params, commit=True):
-        if not self.connected:
-            self.connect()
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
 
-        with self.conn.cursor() as cur:
-            cur.execute(sql, params)
+    def flush(self):
+        if self.statements:
+            self.db_driver.commit_batch(self.conn, self.statements, self.pending, self.commit_batches)
 
-        if commit:
-            self.conn.commit()
+        self.statements = []
+        self.pending = 0
 
 
 def get_db_driver(rdbms_type: str) -> DBAccess:
     if rdbms_type == RDBMSTypes.postgresql.name:
+        from .postgresql_access import PostgreSQLAccess
+
         return PostgreSQLAccess(os.environ.get('ILIQ_P_USERNAME'),
                                 os.environ.get('ILIQ_P_PASSWORD'),
                                 os.environ.get('ILIQ_P_DB_NAME'),
                                 os.environ.get('ILIQ_P_HOST'),
-                                os.environ.get('ILIQ_P_PORT'))
+                                os.environ.get('ILIQ_P_PORT'),
+                                int(os.environ.get('ILIQ_P_FETCH_SIZE', 100)),
+                                int(os.environ.get('ILIQ_P_EXTRACT_WORKERS', 1)),
+                                int(os.environ.get('ILIQ_P_POOL_MIN_SIZE', 0)),
+                                int(os.environ.get('ILIQ_P_POOL_MAX_SIZE', 0)),
+                                int(os.environ.get('ILIQ_P_BATCH_SIZE', 1000)))
+    elif rdbms_type == RDBMSTypes.oracle.name:
+        from .oracle_access import OracleSQLAccess
+
+        fetch_size = int(os.environ.get('ILIQ_P_FETCH_SIZE', 500))
+        return OracleSQLAccess(os.environ.get('ILIQ_P_USERNAME'),
+                               os.environ.get('ILIQ_P_PASSWORD'),
+                               os.environ.get('ILIQ_P_DB_NAME'),
+                               os.environ.get('ILIQ_P_HOST'),
+                               int(os.environ.get('ILIQ_P_PORT', 1521)),
+                               fetch_size,
+                               fetch_size + 1,
+                               int(os.environ.get('ILIQ_P_EXTRACT_WORKERS', 1)),
+                               int(os.environ.get('ILIQ_P_POOL_MIN_SIZE', 0)),
+                               int(os.environ.get('ILIQ_P_POOL_MAX_SIZE', 0)),
+                               int(os.environ.get('ILIQ_P_BATCH_SIZE', 1000)))
     else:
         raise NotImplementedError(f'RDBMS {rdbms_type} is not supported!')
+
+
+def __getattr__(name: str):
+    if name in _DRIVER_MODULES:
+        from importlib import import_module
+
+        return getattr(import_module(f'.{_DRIVER_MODULES[name]}', __package__), name)
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,226 @@
+import io
+import mmap
+import re
+
+_LEXEM_PATTERN = re.compile(r"'|\"|--|/\*|(?<![\w$])\$(?:[A-Za-z_]\w*)?\$")
+_BLOCK_COMMENT_PATTERN = re.compile(r'/\*|\*/')
+_BLOCK_COMMENT_CLOSING = '*/'
+
+
+class DDLLexer:
+
+    def __init__(self, cmd_sep=';'):
+        self.cmd_sep = cmd_sep
+        self.parts = []
+        self.closing = None
+        self.comment_depth = 0
+
+    @property
+    def in_literal(self):
+        return self.closing is not None
+
+    def scan_line(self, line: str) -> bool:
+        sep_pos = len(line) - len(self.cmd_sep) if line.endswith(self.cmd_sep) else -1
+        pos = 0
+
+        while True:
+            if self.closing is None:
+                lexem = _LEXEM_PATTERN.search(line, pos)
+                if lexem is None:
+                    return sep_pos >= pos
+
+                pos = lexem.end()
+                lexem = lexem.group()
+                if lexem == '--':
+                    return False
+
+                if lexem == '/*':
+                    self.closing = _BLOCK_COMMENT_CLOSING
+                    self.comment_depth = 1
+                else:
+                    self.closing = lexem
+
+            elif self.closing == _BLOCK_COMMENT_CLOSING:
+                lexem = _BLOCK_COMMENT_PATTERN.search(line, pos)
+                if lexem is None:
+                    return False
+
+                pos = lexem.end()
+                self.comment_depth += 1 if lexem.group() == '/*' else -1
+                if not self.comment_depth:
+                    self.closing = None
+
+            else:
+                end = line.find(self.closing, pos)
+                if end == -1:
+                    return False
+
+                pos = end + len(self.closing)
+                self.closing = None
+
+    def feed(self, line: str) -> str | None:
+        if self.closing is None and line.startswith('--'):
+            return None
+
+        line = line.strip()
+        self.parts.append(line)
+
+        if not self.scan_line(line):
+            return None
+
+        cmd = '\n' + '\n'.join(self.parts)
+        self.parts = []
+        return cmd.replace('"', '')
+
+
+def parse_ddl_lines(lines,
+                    cmd_sep=';'):
+    lexer = DDLLexer(cmd_sep)
+    for line in lines:
+        cmd = lexer.feed(line)
+        if cmd is not None:
+            yield cmd
+
+
+_EOL_PATTERN = rb'[ \t\r\f\v]*(?:\n|\Z)'
+
+
+def _boundary_pattern(cmd_sep: bytes):
+    sep = re.escape(cmd_sep) + _EOL_PATTERN
+    sep_head = re.escape(cmd_sep[:1])
+    plain = (rb'(?=(?P<run>[^\'"\-/$' + sep_head + rb']+))(?P=run)'
+             rb"|'[^']*'|\"[^\"]*\"|-(?!-)|/(?!\*)"
+             rb'|(?<=[\w$])\$|\$(?!(?:[A-Za-z_]\w*)?\$)|' + sep_head)
+
+    return re.compile(rb'(?:(?!' + sep + rb')(?:' + plain + rb'))*'
+                      rb'(?P<stop>(?P<sep>' + sep + rb')'
+                      rb"|--|/\*|\$(?:[A-Za-z_]\w*)?\$|'|\")")
+
+
+_BLOCK_COMMENT_BYTES_PATTERN = re.compile(rb'/\*|\*/')
+_MMAP_RELEASE_STEP = 64 * 1024 * 1024
+
+
+def iter_ddl_slices(buf,
+                    cmd_sep=';',
+                    encoding='utf-8',
+                    start=0,
+                    end=None):
+    pattern = _boundary_pattern(cmd_sep.encode(encoding))
+    end = len(buf) if end is None else end
+    pos = start
+    skipped = []
+
+    while True:
+        lexem = pattern.match(buf, pos, end)
+        if lexem is None:
+            return
+
+        lexem_start, pos = lexem.span('stop')
+
+        if lexem.group('sep') is not None:
+            yield start, pos, skipped
+            start = pos
+            skipped = []
+            continue
+
+        lexem = lexem.group('stop')
+
+        if lexem == b'--':
+            line_end = buf.find(b'\n', pos, end)
+            line_end = end if line_end == -1 else line_end + 1
+            if lexem_start == 0 or buf[lexem_start - 1] == ord('\n'):
+                skipped.append((lexem_start, line_end))
+            pos = line_end
+
+        elif lexem == b'/*':
+            depth = 1
+            while depth:
+                comment = _BLOCK_COMMENT_BYTES_PATTERN.search(buf, pos, end)
+                if comment is None:
+                    return
+                pos = comment.end()
+                depth += 1 if comment.group() == b'/*' else -1
+
+        else:
+            closing = buf.find(lexem, pos, end)
+            if closing == -1:
+                return
+            pos = closing + len(lexem)
+
+
+def iter_ddl_chunks(buf,
+                    cmd_sep=';',
+                    encoding='utf-8',
+                    chunk_size=4 * 1024 * 1024):
+    chunk_start = 0
+    for start, end, skipped in iter_ddl_slices(buf, cmd_sep, encoding):
+        if end - chunk_start >= chunk_size:
+            yield chunk_start, end
+            chunk_start = end
+
+    if chunk_start < len(buf):
+        yield chunk_start, len(buf)
+
+
+def decode_ddl_slice(buf,
+                     start: int,
+                     end: int,
+                     skipped: list,
+                     encoding='utf-8') -> str:
+    pieces = []
+    for s, e in skipped:
+        pieces.append(buf[start:s])
+        start = e
+    pieces.append(buf[start:end])
+
+    cmd = b''.join(pieces).decode(encoding)
+    if cmd.endswith('\n'):
+        cmd = cmd[:-1]
+
+    cmd = '\n' + '\n'.join(line.strip() for line in cmd.split('\n'))
+    return cmd.replace('"', '')
+
+
+def is_ascii_compatible(encoding: str):
+    probe = '\n;\'"-/*$ GO'
+    try:
+        return probe.encode(encoding) == probe.encode('ascii')
+    except (LookupError, UnicodeError):
+        return False
+
+
+def open_ddl_mmap(sql_f):
+    if not sql_f.seekable():
+        return None
+
+    try:
+        buf = mmap.mmap(sql_f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        return None
+
+    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+        buf.madvise(mmap.MADV_SEQUENTIAL)
+
+    return buf
+
+
+def parse_ddl_mmap(file_name: str,
+                   cmd_sep=';',
+                   encoding='utf-8'):
+    with open(file_name, 'rb') as sql_f:
+        buf = open_ddl_mmap(sql_f) if is_ascii_compatible(encoding) else None
+
+        if buf is None:
+            yield from parse_ddl_lines(io.TextIOWrapper(sql_f, encoding=encoding), cmd_sep)
+            return
+
+        with buf:
+            released = 0
+            for start, end, skipped in iter_ddl_slices(buf, cmd_sep, encoding):
+                yield decode_ddl_slice(buf, start, end, skipped, encoding)
+
+                if start - released >= _MMAP_RELEASE_STEP and hasattr(mmap, 'MADV_DONTNEED'):
+                    release_to = start - start % mmap.PAGESIZE
+                    buf.madvise(mmap.MADV_DONTNEED, released, release_to - released)
+                    released = release_to
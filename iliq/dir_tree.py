@@ -1,10 +1,15 @@
 import os
 import re
+import time
 
+from collections import deque
 from enum import Enum
+from functools import partial
 from shutil import rmtree
 
 from .db_connectors import DBAccess, RDBMSTypes
+from .ddl_parser import (parse_ddl_lines, parse_ddl_mmap, open_ddl_mmap, is_ascii_compatible,
+                         iter_ddl_slices, iter_ddl_chunks, decode_ddl_slice)
 
 _OBJECTS_PATH_NAMES = ('tables', 'views', 'procedures', 'functions',
                        'packages', 'scripts', 'triggers', 'sequences',
@@ -111,6 +116,38 @@ class DDLTypesMap(Enum):
             return -1
 
 
+def _compile_ddl_commands(commands_map: dict):
+    states = []
+
+    def add_state(node: dict):
+        state_no = len(states)
+        states.append(None)
+
+        transitions, default = {}, None
+        for k, v in node.items():
+            if k.startswith('!'):
+                default = DDLTypesMap[v]
+            else:
+                transitions[k] = DDLTypesMap[v] if isinstance(v, str) else add_state(v)
+
+        states[state_no] = (transitions, default)
+        return state_no
+
+    add_state(commands_map)
+    return tuple(states)
+
+
+_DDL_COMMANDS_STATES = _compile_ddl_commands(_DDL_COMMANDS_MAP)
+_DDL_TOKEN_PATTERN = re.compile(r'(?:"[^"]*"|[^\s"])+')
+_DDL_CLASSIFY_MAX_TOKENS = 16
+_DDL_CLASSIFY_PREFIX_LEN = 256
+
+_INDEX_OWNER_PATTERN = re.compile(r'(?<=ON)[\w\."\s]*(?=\()')
+_CONSTRAINT_OWNER_PATTERN = re.compile(r'(?<=TABLE).*(?=ADD)')
+_SECONDARY_DDL_BUFFER_SIZE = 64 * 1024 * 1024
+CACHE_DIR_NAME = '__iliq_cache__'
+
+
 class ChangelogTypes(Enum):
     per_schema = 'PER_SCHEMA'
     united = 'UNITED'
@@ -122,83 +159,219 @@ class ChangelogTypes(Enum):
             return super().__eq__(other)
 
 
-class DirTree:
+def split_object_name(o_type: DDLTypesMap,
+                      o_name: str,
+                      ddl_cmd: str) -> tuple[str, str]:
+    if o_type.name in ('index', 'constraint'):
+        r_pattern = _INDEX_OWNER_PATTERN if o_type.name == 'index' else _CONSTRAINT_OWNER_PATTERN
+        o_name = r_pattern.search(ddl_cmd)
+        o_name = o_name.group().strip().replace('"', '')
+
+    o_path = o_name.split(sep='.')
+    return o_path[0], o_path[1]
+
+
+def make_object_dir(dir_path: str,
+                    created_dirs: set,
+                    rollbacks=False):
+    if dir_path in created_dirs:
+        return
+
+    os.makedirs(dir_path, exist_ok=True)
+    if rollbacks:
+        os.makedirs(os.path.join(dir_path, 'rollbacks'), exist_ok=True)
+    created_dirs.add(dir_path)
 
-    @staticmethod
-    def classify_ddl(ddl_cmd) -> tuple[str, DDLTypesMap]:
-        found = False
-        current_context = o_name = None
-
-        for i, part in enumerate(ddl_cmd.split()):
-            if i == 0 and part not in _DDL_COMMANDS_MAP:
-                raise ValueError('Wrong beginning for the DDL command!')
-            elif i == 0:
-                current_context = _DDL_COMMANDS_MAP[part]
-                continue
 
-            if found:
-                o_name = part
+class DDLObjectWriter:
+
+    def __init__(self,
+                 parent_dir: str,
+                 encoding='utf-8',
+                 buffer_size=_SECONDARY_DDL_BUFFER_SIZE,
+                 lazy_dirs=False,
+                 rollbacks=False,
+                 created_dirs: set = None):
+        self.parent_dir = parent_dir
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.lazy_dirs = lazy_dirs
+        self.rollbacks = rollbacks
+        self.buffers = {}
+        self.buffered = 0
+        self.known_files = {}
+        self.created_dirs = set() if created_dirs is None else created_dirs
+
+    def file_exists(self, o_file_path: str):
+        exists = self.known_files.get(o_file_path)
+        if exists is None:
+            exists = self.known_files[o_file_path] = os.path.exists(o_file_path)
+        return exists
+
+    def put(self,
+            o_type: DDLTypesMap,
+            schema: str,
+            o_name: str,
+            ddl_cmd: str):
+        if not o_type.own_file:
+            for o_path_type in o_type.path_name:
+                o_file_path = os.path.join(self.parent_dir,
+                                           schema,
+                                           o_path_type,
+                                           f'{o_name}.sql')
+                if not self.file_exists(o_file_path):
+                    continue
+
+                self.buffers.setdefault(o_file_path, []).append(ddl_cmd)
+                self.buffered += len(ddl_cmd)
+
+            if self.buffered > self.buffer_size:
+                self.spill()
+
+        elif o_type.own_file:
+            o_dir_path = os.path.join(self.parent_dir, schema, o_type.path_name)
+            if self.lazy_dirs:
+                make_object_dir(o_dir_path, self.created_dirs, self.rollbacks)
+
+            o_file_path = os.path.join(o_dir_path, f'{o_name}.sql')
+            self.buffered -= sum(len(c) for c in self.buffers.pop(o_file_path, ()))
+
+            o_file = open(o_file_path, 'w', encoding=self.encoding)
+            o_file.write(ddl_cmd)
+            o_file.close()
+            self.known_files[o_file_path] = True
+
+    def flush_file(self, o_file_path: str):
+        ddl_cmds = self.buffers.pop(o_file_path)
+        self.buffered -= sum(len(c) for c in ddl_cmds)
+
+        o_file = open(o_file_path, 'a', encoding=self.encoding)
+        o_file.write(''.join(f'\n{c}' for c in ddl_cmds))
+        o_file.close()
+
+    def spill(self):
+        by_size = sorted(self.buffers, key=lambda p: sum(len(c) for c in self.buffers[p]), reverse=True)
+        for o_file_path in by_size:
+            if self.buffered <= self.buffer_size // 2:
                 break
+            self.flush_file(o_file_path)
+
+    def flush(self):
+        for o_file_path in list(self.buffers):
+            self.flush_file(o_file_path)
+
+
+def _classify_ddl_chunk(file_name: str,
+                        cmd_sep: str,
+                        encoding: str,
+                        start: int,
+                        end: int):
+    res = []
+    with open(file_name, 'rb') as sql_f, open_ddl_mmap(sql_f) as buf:
+        for cmd_start, cmd_end, skipped in iter_ddl_slices(buf, cmd_sep, encoding, start, end):
+            cmd = decode_ddl_slice(buf, cmd_start, cmd_end, skipped, encoding)
+            o_name, o_type = DirTree.classify_ddl(cmd)
+            schema, o_name = split_object_name(o_type, o_name.replace('"', ''), cmd)
+            res.append((cmd_start, cmd_end, skipped, schema, o_name, o_type.name))
+
+    return res
+
+
+def _put_ddl_partition(file_name: str,
+                       encoding: str,
+                       parent_dir: str,
+                       tree_encoding: str,
+                       buffer_size: int,
+                       lazy_dirs: bool,
+                       rollbacks: bool,
+                       ddl_recs: list):
+    writer = DDLObjectWriter(parent_dir, tree_encoding, buffer_size, lazy_dirs, rollbacks)
+    with open(file_name, 'rb') as sql_f, open_ddl_mmap(sql_f) as buf:
+        for cmd_start, cmd_end, skipped, schema, o_name, o_type in ddl_recs:
+            cmd = decode_ddl_slice(buf, cmd_start, cmd_end, skipped, encoding)
+            writer.put(DDLTypesMap[o_type], schema, o_name, cmd)
+    writer.flush()
 
-            if part not in current_context:
-                o_name = part
-                for tp in ('!TABLE', '!SEQUENCE'):
-                    if tp in current_context:
-                        current_context = DDLTypesMap[current_context[tp]]
-                        return o_name, current_context
-            else:
-                current_context = current_context[part]
-                if isinstance(current_context, str):
-                    found = True
-        current_context = DDLTypesMap[current_context]
-        return o_name, current_context
 
-    @staticmethod
-    def check_quotations(cmd: str):
-        cnt = 0
-        for c in cmd:
-            if c == '\'':
-                if cnt == 0:
-                    cnt += 1
-                elif cnt == 1:
-                    cnt -= 1
+class DirTree:
 
-        return not cnt
+    @staticmethod
+    def classify_ddl(ddl_cmd) -> tuple[str, DDLTypesMap]:
+        prefix_len = _DDL_CLASSIFY_PREFIX_LEN
+
+        while True:
+            head = ddl_cmd[:prefix_len]
+            complete = prefix_len >= len(ddl_cmd)
+            parts = _DDL_TOKEN_PATTERN.findall(head) if '"' in head else head.split()
+            if not complete and parts:
+                parts.pop()
+
+            state = 0
+            found = o_name = None
+
+            for i, part in enumerate(parts):
+                if found:
+                    return part, found
+                if i == _DDL_CLASSIFY_MAX_TOKENS:
+                    raise ValueError(f'Unknown DDL command: {head[:100].strip()}')
+
+                transitions, default = _DDL_COMMANDS_STATES[state]
+                next_state = transitions.get(part) or transitions.get(part.upper())
+
+                if next_state is None:
+                    if i == 0:
+                        raise ValueError('Wrong beginning for the DDL command!')
+                    o_name = part
+                    if default:
+                        return o_name, default
+                elif isinstance(next_state, int):
+                    state = next_state
+                else:
+                    found = next_state
+
+            if complete:
+                if found:
+                    return o_name, found
+                raise ValueError(f'Unknown DDL command: {head[:100].strip()}')
+
+            prefix_len *= 4
 
     @staticmethod
     def parse_ddl_file(file_name: str,
                        cmd_sep=';',
-                       encoding='utf-8'):
-        with open(file_name, 'r', encoding=encoding) as sql_f:
-            cmd = ''
-
-            while True:
-                line = sql_f.readline()
-                if not line:
-                    break
-
-                if not line.startswith('--'):
-                    cmd += '\n' + line.strip()
-                    if '\'' in cmd and not DirTree.check_quotations(cmd):
-                        continue
+                       encoding='utf-8',
+                       use_mmap=False):
+        if use_mmap:
+            yield from parse_ddl_mmap(file_name, cmd_sep, encoding)
+            return
 
-                if cmd.endswith(cmd_sep):
-                    cmd = cmd.replace('"', '')
-                    yield cmd
-                    cmd = ''
+        with open(file_name, 'r', encoding=encoding) as sql_f:
+            yield from parse_ddl_lines(sql_f, cmd_sep)
 
     def __init__(self,
                  db_driver: DBAccess,
                  parent_dir: str = '.',
                  changelog_type: ChangelogTypes = ChangelogTypes.united,
                  rollbacks=False,
-                 tree_encoding='utf-8'):
+                 tree_encoding='utf-8',
+                 ddl_workers=1,
+                 ddl_buffer_size=_SECONDARY_DDL_BUFFER_SIZE,
+                 writer_threads=4,
+                 queue_depth=64,
+                 lazy_dirs=False):
         self.db_driver = db_driver
         self.parent_dir = parent_dir
         self.changelog_type = changelog_type
         self.rollbacks = rollbacks
         self.o_types_paths = tuple(DDLTypesMap.get_ddl_path_names(db_driver.rdbms_type))
         self.encoding = tree_encoding
+        self.ddl_workers = ddl_workers
+        self.ddl_buffer_size = ddl_buffer_size
+        self.writer_threads = writer_threads
+        self.queue_depth = queue_depth
+        self.pipeline_timings = {}
+        self.lazy_dirs = lazy_dirs
+        self.created_dirs = set()
 
     def __str__(self):
         res = f'DirTree instance for {self.db_driver.db_name} database'
@@ -222,6 +395,10 @@ class DirTree:
             else:
                 raise
 
+        self.created_dirs.clear()
+        if self.lazy_dirs:
+            return
+
         for s in self.db_driver.get_all_schemas():
             schema_path = os.path.join(self.parent_dir, s)
             liq_schema_path = os.path.join(self.united_liq_path, s)
@@ -235,43 +412,40 @@ class DirTree:
                     tp_r_path = os.path.join(tp_path, 'rollbacks')
                     os.mkdir(tp_r_path)
 
+    def ensure_dir(self,
+                   dir_path: str,
+                   with_rollbacks=False):
+        if self.lazy_dirs:
+            make_object_dir(dir_path, self.created_dirs, with_rollbacks and self.rollbacks)
+        return dir_path
+
+    def get_object_writer(self):
+        return DDLObjectWriter(self.parent_dir,
+                               self.encoding,
+                               self.ddl_buffer_size,
+                               self.lazy_dirs,
+                               self.rollbacks,
+                               self.created_dirs)
+
+    def iter_object_files(self):
+        skipped = (CACHE_DIR_NAME, os.path.basename(self.united_liq_path))
+        for schema in os.scandir(self.parent_dir):
+            if not schema.is_dir() or schema.name in skipped:
+                continue
+            for tp in os.scandir(schema.path):
+                if not tp.is_dir():
+                    continue
+                for o_file in os.scandir(tp.path):
+                    if o_file.is_file() and o_file.name.endswith('.sql'):
+                        yield os.path.join('.', schema.name, tp.name, o_file.name)
+
     def put_object_into_tree(self,
                              o_type: DDLTypesMap,
                              o_name: str,
                              ddl_cmd: str):
-        if not o_type.own_file:
-            if o_type.name in ('index', 'constraint'):
-                r_pattern = r'(?<=ON)[\w\."\s]*(?=\()' if o_type.name == 'index' else r'(?<=TABLE).*(?=ADD)'
-                o_name = re.search(r_pattern, ddl_cmd)
-                o_name = o_name.group().strip().replace('"', '')
-
-            o_path = o_name.split(sep='.')
-            schema, o_name = o_path[0], o_path[1]
-
-            for o_path_type in o_type.path_name:
-                o_file_path = os.path.join(self.parent_dir,
-                                           schema,
-                                           o_path_type,
-                                           f'{o_name}.sql')
-                try:
-                    o_file = open(o_file_path, 'r+', encoding=self.encoding)
-                except FileNotFoundError:
-                    continue
-
-                o_file.seek(0, os.SEEK_END)
-                o_file.write(f'\n{ddl_cmd}')
-                o_file.close()
-
-        elif o_type.own_file:
-            o_path = o_name.split(sep='.')
-            schema, o_name = o_path[0], o_path[1]
-            o_file_path = os.path.join(self.parent_dir,
-                                       schema,
-                                       o_type.path_name,
-                                       f'{o_name}.sql')
-            o_file = open(o_file_path, 'w', encoding=self.encoding)
-            o_file.write(ddl_cmd)
-            o_file.close()
+        writer = self.get_object_writer()
+        writer.put(o_type, *split_object_name(o_type, o_name, ddl_cmd), ddl_cmd)
+        writer.flush()
 
     def add_paths_to_object_rec(self, object_rec: dict):
         o_type = DDLTypesMap[object_rec['object_type']]
@@ -291,105 +465,193 @@ class DirTree:
     def put_ddl_file_into_tree(self,
                                file_name: str,
                                cmd_sep=';',
-                               file_encoding='utf-8'):
-        for cmd in self.parse_ddl_file(file_name, cmd_sep, file_encoding):
-            o_name, o_type = self.classify_ddl(cmd)
-            o_name = o_name.replace('"', '')
-
-            self.put_object_into_tree(o_type, o_name, cmd)
-
-            if o_type.own_file:
-                o_name = o_name.replace('"', '')
-                o_path = o_name.split(sep='.')
-                schema, o_name = o_path[0], o_path[1]
-
-                res = {'schema_name': schema,
-                       'object_name': o_name,
-                       'object_type': o_type.name}
+                               file_encoding='utf-8',
+                               use_mmap=False,
+                               workers: int = None):
+        workers = self.ddl_workers if workers is None else workers
+        # extra processes only add pickling and IPC without spare cores
+        workers = min(workers, os.cpu_count() or 1)
+        if workers > 1:
+            yield from self.put_ddl_file_into_tree_parallel(file_name, cmd_sep, file_encoding, workers)
+            return
+
+        writer = self.get_object_writer()
+        try:
+            for cmd in self.parse_ddl_file(file_name, cmd_sep, file_encoding, use_mmap):
+                o_name, o_type = self.classify_ddl(cmd)
+                schema, o_name = split_object_name(o_type, o_name.replace('"', ''), cmd)
 
-                self.add_paths_to_object_rec(res)
+                writer.put(o_type, schema, o_name, cmd)
 
-                yield res
+                if o_type.own_file:
+                    res = {'schema_name': schema,
+                           'object_name': o_name,
+                           'object_type': o_type.name}
 
-    def put_views_routines_triggers_into_tree(self):
-        for object_rec in self.db_driver.get_views_routines_triggers():
-            o_type = DDLTypesMap[object_rec['object_type']]
-            object_path = os.path.join(self.parent_dir,
-                                       object_rec['schema_name'],
-                                       o_type.path_name,
-                                       f"{object_rec['object_name']}.sql")
+                    self.add_paths_to_object_rec(res)
 
-            self.add_paths_to_object_rec(object_rec)
+                    yield res
+        finally:
+            writer.flush()
 
+    def put_native_ddl_into_tree(self):
+        writer = self.get_object_writer()
+        try:
+            for object_rec in self.db_driver.get_native_ddl():
+                o_type = DDLTypesMap[object_rec['object_type']]
+                writer.put(o_type,
+                           object_rec['schema_name'],
+                           object_rec['object_name'],
+                           f"\n{object_rec['object_text']}")
+
+                if o_type.own_file:
+                    res = {'schema_name': object_rec['schema_name'],
+                           'object_name': object_rec['object_name'],
+                           'object_type': o_type.name}
+
+                    self.add_paths_to_object_rec(res)
+
+                    yield res
+        finally:
+            writer.flush()
+
+    def put_ddl_file_into_tree_parallel(self,
+                                        file_name: str,
+                                        cmd_sep=';',
+                                        file_encoding='utf-8',
+                                        workers: int = 2):
+        with open(file_name, 'rb') as sql_f:
+            buf = open_ddl_mmap(sql_f) if is_ascii_compatible(file_encoding) else None
+            if buf is None:
+                yield from self.put_ddl_file_into_tree(file_name, cmd_sep, file_encoding, workers=1)
+                return
+
+            with buf:
+                chunks = list(iter_ddl_chunks(buf, cmd_sep, file_encoding))
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            classified = pool.map(partial(_classify_ddl_chunk, file_name, cmd_sep, file_encoding),
+                                  [start for start, _ in chunks],
+                                  [end for _, end in chunks])
+
+            objects = []
+            partitions = {}
+            for chunk in classified:
+                for ddl_rec in chunk:
+                    schema, o_name, o_type = ddl_rec[3:]
+                    partitions.setdefault(schema, []).append(ddl_rec)
+                    if DDLTypesMap[o_type].own_file:
+                        objects.append((schema, o_name, o_type))
+
+            workers_load = [[] for _ in range(workers)]
+            for partition in sorted(partitions.values(), key=len, reverse=True):
+                min(workers_load, key=len).extend(partition)
+
+            for f in [pool.submit(_put_ddl_partition,
+                                  file_name, file_encoding, self.parent_dir, self.encoding,
+                                  self.ddl_buffer_size // workers, self.lazy_dirs, self.rollbacks, load)
+                      for load in workers_load if load]:
+                f.result()
+
+        for schema, o_name, o_type in objects:
+            res = {'schema_name': schema,
+                   'object_name': o_name,
+                   'object_type': o_type}
+
+            self.add_paths_to_object_rec(res)
+
+            yield res
+
+    def put_records_into_tree(self,
+                              records,
+                              stage_name='records'):
+        timings = {'objects': 0, 'fetch': 0.0, 'write': 0.0, 'wait': 0.0, 'wall': 0.0}
+        self.pipeline_timings[stage_name] = timings
+        started = time.perf_counter()
+        pending = deque()
+        in_flight = {}
+
+        def write_object(object_path, object_text):
+            write_started = time.perf_counter()
             object_f = open(object_path, 'w', encoding=self.encoding)
-            object_f.write(object_rec.pop('object_text'))
+            object_f.write(object_text)
             object_f.close()
+            return time.perf_counter() - write_started
+
+        def complete_object():
+            object_rec, object_path, written = pending.popleft()
+            wait_started = time.perf_counter()
+            timings['write'] += written.result()
+            timings['wait'] += time.perf_counter() - wait_started
+            if in_flight.get(object_path) is written:
+                del in_flight[object_path]
+            timings['objects'] += 1
+            timings['wall'] = time.perf_counter() - started
+            return object_rec
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        records = iter(records)
+        with ThreadPoolExecutor(max_workers=self.writer_threads) as pool:
+            while True:
+                fetch_started = time.perf_counter()
+                object_rec = next(records, None)
+                timings['fetch'] += time.perf_counter() - fetch_started
+                if object_rec is None:
+                    break
 
-            yield object_rec
-
-    def put_routines_into_tree(self):
-        for routine_rec in self.db_driver.get_all_procedures():
-            o_type = DDLTypesMap[routine_rec['object_type']]
-            routine_path = os.path.join(self.parent_dir,
-                                        routine_rec['schema_name'],
-                                        o_type.path_name,
-                                        f"{routine_rec['object_name']}.sql")
-
-            self.add_paths_to_object_rec(routine_rec)
+                o_type = DDLTypesMap[object_rec['object_type']]
+                object_dir = self.ensure_dir(os.path.join(self.parent_dir,
+                                                          object_rec['schema_name'],
+                                                          o_type.path_name),
+                                             with_rollbacks=True)
+                object_path = os.path.join(object_dir, f"{object_rec['object_name']}.sql")
+
+                self.add_paths_to_object_rec(object_rec)
+
+                # same-named objects (e.g. triggers on several tables) share a file, the last record wins
+                previous = in_flight.get(object_path)
+                if previous is not None:
+                    wait_started = time.perf_counter()
+                    previous.result()
+                    timings['wait'] += time.perf_counter() - wait_started
+
+                written = pool.submit(write_object, object_path, object_rec.pop('object_text'))
+                in_flight[object_path] = written
+                pending.append((object_rec, object_path, written))
+                if len(pending) >= self.queue_depth:
+                    yield complete_object()
+
+            while pending:
+                yield complete_object()
+
+    def format_pipeline_timings(self):
+        for stage_name, t in self.pipeline_timings.items():
+            yield (f'{stage_name}: {t["objects"]} objects in {t["wall"]:.2f}s '
+                   f'(fetch {t["fetch"]:.2f}s, write {t["write"]:.2f}s '
+                   f'in {self.writer_threads} threads, waited for writes {t["wait"]:.2f}s)')
 
-            routine_f = open(routine_path, 'w', encoding=self.encoding)
-            routine_f.write(routine_rec.pop('object_text'))
-            routine_f.close()
+    def put_views_routines_triggers_into_tree(self):
+        yield from self.put_records_into_tree(self.db_driver.get_views_routines_triggers(),
+                                              'views_routines_triggers')
 
-            yield routine_rec
+    def put_routines_into_tree(self):
+        yield from self.put_records_into_tree(self.db_driver.get_all_procedures(),
+                                              'routines')
 
     def put_triggers_into_tree(self):
-        for trigger_rec in self.db_driver.get_all_triggers():
-            o_type = DDLTypesMap[trigger_rec['object_type']]
-            trigger_path = os.path.join(self.parent_dir,
-                                        trigger_rec['schema_name'],
-                                        o_type.path_name,
-                                        f"{trigger_rec['object_name']}.sql")
-
-            self.add_paths_to_object_rec(trigger_rec)
-
-            trigger_f = open(trigger_path, 'w', encoding=self.encoding)
-            trigger_f.write(trigger_rec.pop('object_text'))
-            trigger_f.close()
-
-            yield trigger_rec
+        yield from self.put_records_into_tree(self.db_driver.get_all_triggers(),
+                                              'triggers')
 
     def put_mat_views_into_tree(self):
-        for m_view_rec in self.db_driver.get_all_mat_views():
-            o_type = DDLTypesMap[m_view_rec['object_type']]
-            m_view_path = os.path.join(self.parent_dir,
-                                       m_view_rec['schema_name'],
-                                       o_type.path_name,
-                                       f"{m_view_rec['object_name']}.sql")
-
-            self.add_paths_to_object_rec(m_view_rec)
-
-            m_view_f = open(m_view_path, 'w', encoding=self.encoding)
-            m_view_f.write(m_view_rec.pop('object_text'))
-            m_view_f.close()
-
-            yield m_view_rec
+        yield from self.put_records_into_tree(self.db_driver.get_all_mat_views(),
+                                              'mat_views')
 
     def put_composite_types_into_tree(self):
-        for c_type_rec in self.db_driver.get_all_composite_types():
-            o_type = DDLTypesMap[c_type_rec['object_type']]
-            c_type_path = os.path.join(self.parent_dir,
-                                       c_type_rec['schema_name'],
-                                       o_type.path_name,
-                                       f"{c_type_rec['object_name']}.sql")
-
-            self.add_paths_to_object_rec(c_type_rec)
-
-            c_type_f = open(c_type_path, 'w', encoding=self.encoding)
-            c_type_f.write(c_type_rec.pop('object_text'))
-            c_type_f.close()
-
-            yield c_type_rec
+        yield from self.put_records_into_tree(self.db_driver.get_all_composite_types(),
+                                              'composite_types')
 
 
 def get_project_path():
@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from .liqui import build_interpreter
+
+
+_CONTEXT_COMMANDS = ('get_update_sql', 'upload_sql_changelog', 'update')
+_PLAIN_COMMANDS = ('create_liq_tables', 'init_project', 'sync_project')
+FLEET_COMMANDS = _CONTEXT_COMMANDS + _PLAIN_COMMANDS
+
+_REPORT_FILE_NAME = 'fleet_report.json'
+
+
+def expand_env_paths(paths: list):
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            yield from sorted(path.glob('*.env'))
+        else:
+            yield path
+
+
+def fleet_log_name(number: int, env_path: str):
+    # profiles often share a stem (a/.env, b/.env), the number keeps the log files apart
+    path = Path(env_path).resolve()
+    return f'{number:03d}_{path.parent.name}_{path.stem}.log'
+
+
+def run_fleet_command(env_path: str,
+                      command: str,
+                      contexts: list,
+                      log_path: str):
+    res = {'env_file': env_path,
+           'db_name': None,
+           'status': 'failed',
+           'error': None,
+           'log_file': log_path}
+    started = time.perf_counter()
+
+    saved_environ = dict(os.environ)
+    saved_stdin = sys.stdin
+    saved_fds = os.dup(1), os.dup(2)
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    iliq = None
+    with open(log_path, 'w') as log_f, open(os.devnull) as null_f:
+        os.dup2(log_f.fileno(), 1)
+        os.dup2(log_f.fileno(), 2)
+        sys.stdin = null_f
+        try:
+            from dotenv import load_dotenv
+
+            load_dotenv(dotenv_path=env_path, override=True)
+            iliq = build_interpreter()
+            res['db_name'] = iliq.db_driver.db_name
+
+            if command in _CONTEXT_COMMANDS:
+                getattr(iliq, command)(contexts=contexts)
+            else:
+                getattr(iliq, command)()
+
+            res['status'] = 'ok'
+        except Exception as e:
+            res['error'] = f'{type(e).__name__}: {e}'
+            traceback.print_exc()
+        finally:
+            if iliq is not None:
+                iliq.save_cache()
+                iliq.close_project_state()
+                iliq.db_driver.close_conn()
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+            sys.stdin = saved_stdin
+            for fd, saved_fd in enumerate(saved_fds, start=1):
+                os.dup2(saved_fd, fd)
+                os.close(saved_fd)
+
+            os.environ.clear()
+            os.environ.update(saved_environ)
+
+    res['duration'] = time.perf_counter() - started
+    return res
+
+
+def run_fleet(env_paths: list,
+              command: str,
+              contexts: list = None,
+              workers=4,
+              log_dir='.'):
+    os.makedirs(log_dir, exist_ok=True)
+    env_paths = [str(p) for p in env_paths]
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_fleet_command,
+                               env_path,
+                               command,
+                               contexts,
+                               os.path.join(log_dir, fleet_log_name(number, env_path))): number
+                   for number, env_path in enumerate(env_paths, start=1)}
+        for f in as_completed(futures):
+            res = f.result()
+            results[futures[f]] = res
+            print(f"{res['status']:>6} {res['duration']:8.2f}s  {res['db_name'] or '-'} ({res['env_file']})")
+
+    return [results[number] for number in sorted(results)]
+
+
+def format_fleet_report(results: list, wall: float):
+    for res in results:
+        line = f"{res['status']:>6} {res['duration']:8.2f}s  {res['db_name'] or '-'}  {res['log_file']}"
+        if res['error']:
+            line += f"\n{'':>17}{res['error']}"
+        yield line
+
+    succeeded = sum(1 for res in results if res['status'] == 'ok')
+    yield (f'{succeeded} succeeded, {len(results) - succeeded} failed '
+           f'in {wall:.2f}s (sum of database durations {sum(res["duration"] for res in results):.2f}s)')
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='iliq-fleet',
+                                     description='Runs an iliq command against many databases')
+    parser.add_argument('command', choices=FLEET_COMMANDS)
+    parser.add_argument('env_paths', nargs='+',
+                        help='.env files or directories with *.env connection profiles')
+    parser.add_argument('--contexts', default=None,
+                        help='comma separated Liquibase contexts')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('ILIQ_FLEET_WORKERS', 4)))
+    parser.add_argument('--log-dir', default=None)
+    args = parser.parse_args()
+
+    env_paths = list(expand_env_paths(args.env_paths))
+    contexts = args.contexts.split(',') if args.contexts else None
+    log_dir = args.log_dir or os.path.join('iliq_fleet_logs', time.strftime('%Y%m%d_%H%M%S'))
+
+    started = time.perf_counter()
+    results = run_fleet(env_paths, args.command, contexts, args.workers, log_dir)
+    wall = time.perf_counter() - started
+
+    print()
+    for line in format_fleet_report(results, wall):
+        print(line)
+
+    with open(os.path.join(log_dir, _REPORT_FILE_NAME), 'w') as f:
+        f.write(json.dumps({'command': args.command, 'wall': wall, 'results': results}, indent=2))
+
+    sys.exit(0 if all(res['status'] == 'ok' for res in results) else 1)
@@ -2,18 +2,31 @@ import json
 import os
 import subprocess
 import re
+import sys
+import time
 
-from dotenv import load_dotenv
 from pathlib import Path
-from difflib import get_close_matches
+from shutil import rmtree
 from enum import Enum
 from .db_connectors import DBAccess, RDBMSTypes, get_db_driver
-from .dir_tree import DirTree, DDLTypesMap, ChangelogTypes, get_project_path
+from .dir_tree import DirTree, DDLTypesMap, ChangelogTypes, CACHE_DIR_NAME, get_project_path
 from .change_set import ChangeSet, VersionTag, ChangeLog
 
 
-_CACHE_DIR_NAME = '__iliq_cache__'
+_CACHE_DIR_NAME = CACHE_DIR_NAME
 _CACHE_FILE_NAME = '__instance_cache__.json'
+_FINGERPRINTS_CACHE_FILE_NAME = '__fingerprints_cache__.json'
+_STAGING_DIR_NAME = '__staging__'
+_FLOW_FILE_NAME = '__iliq_flow__.yaml'
+
+_CHANGELOG_INSERT_PATTERN = re.compile(r'^\s*insert\s+into\s+(?P<table>\S+)\s*\((?P<columns>[^)]*)\)'
+                                       r'\s*values\s*\((?P<values>.*)\)\s*;?\s*$',
+                                       flags=re.IGNORECASE | re.DOTALL)
+_SQL_VALUE_TOKEN_PATTERN = re.compile(r"'(?:[^']|'')*'|[(),]|[^'(),]+")
+_SQL_INTEGER_PATTERN = re.compile(r'-?\d+')
+_CHANGELOG_DML_PATTERN = re.compile('insert.*databasechangelog .*;', flags=re.IGNORECASE)
+_FLOW_STEP_MARKER = 'ILIQ_FLOW_STEP_DONE'
+_FLOW_STEP_MARKER_PATTERN = re.compile(rf'\s*{_FLOW_STEP_MARKER} (?P<step>\d+)\s*')
 
 
 class LiqCommands(Enum):
@@ -56,23 +69,162 @@ class LiqCommands(Enum):
                         '--changelog-file={changelog_file} '
                         '--contexts "{context}" '
                         '--tag={version} ')
+    FLOW = ('liquibase '
+            '--defaults-file={defaults_file} '
+            'flow '
+            '--flow-file={flow_file}')
 
     def format(self, *arg, **kwargs):
         return self.value.format(*arg, **kwargs)
 
 
+class LiqFlow:
+
+    def __init__(self, interpreter: 'LiqInterpreter'):
+        self.interpreter = interpreter
+        self.steps = []
+
+    def add_step(self, name: str, command: str, **cmd_args):
+        cmd_args = {k.replace('_', '-'): v for k, v in cmd_args.items() if v is not None}
+        self.steps.append((name, command, cmd_args))
+        return self
+
+    def tag(self, version: str):
+        return self.add_step('tag', 'tag', tag=version)
+
+    def update_sql(self, contexts: list = None):
+        return self.add_step('get_update_sql', 'update-sql',
+                             changelog_file=self.interpreter.change_log.file_name,
+                             contexts=','.join(contexts) if contexts else None)
+
+    def update(self, contexts: list = None):
+        return self.add_step('update', 'update',
+                             changelog_file=self.interpreter.change_log.file_name,
+                             contexts=','.join(contexts) if contexts else None)
+
+    def rollback(self, version: str, contexts: list = None):
+        return self.add_step('rollback', 'rollback',
+                             changelog_file=self.interpreter.change_log.file_name,
+                             contexts=','.join(contexts) if contexts else None,
+                             tag=version)
+
+    def rollback_sql(self, version: str, contexts: list = None):
+        return self.add_step('get_rollback_sql', 'rollback-sql',
+                             changelog_file=self.interpreter.change_log.file_name,
+                             contexts=','.join(contexts) if contexts else None,
+                             tag=version)
+
+    @property
+    def flow_file_path(self):
+        return os.path.join(self.interpreter.iliq_cache_path, _FLOW_FILE_NAME)
+
+    def flow_document(self):
+        actions = []
+        for number, (_, command, cmd_args) in enumerate(self.steps):
+            actions.append({'type': 'liquibase', 'command': command, 'cmdArgs': cmd_args})
+            actions.append({'type': 'shell', 'command': f'echo {_FLOW_STEP_MARKER} {number}'})
+
+        return {'stages': {'iliq': {'actions': actions}}}
+
+    def save_flow_file(self):
+        os.makedirs(self.interpreter.iliq_cache_path, exist_ok=True)
+        # JSON is valid YAML, so no YAML library is needed for the flow file
+        with open(self.flow_file_path, 'w') as f:
+            f.write(json.dumps(self.flow_document(), indent=2))
+
+    def map_results(self, output: str, return_code: int):
+        outputs = [[] for _ in self.steps]
+        finished = 0
+        for line in output.splitlines():
+            marker = _FLOW_STEP_MARKER_PATTERN.fullmatch(line)
+            if marker is not None:
+                finished = max(finished, int(marker.group('step')) + 1)
+            elif _FLOW_STEP_MARKER in line:
+                continue
+            elif finished < len(self.steps):
+                outputs[finished].append(line)
+            else:
+                outputs[-1].append(line)
+
+        results = []
+        for number, (name, command, _) in enumerate(self.steps):
+            if number < finished or return_code == 0:
+                status = 'ok'
+            elif number == finished:
+                status = 'failed'
+            else:
+                status = 'skipped'
+
+            results.append({'step': name,
+                            'command': command,
+                            'status': status,
+                            'output': '\n'.join(outputs[number])})
+
+        return results
+
+    def run(self):
+        if not self.steps:
+            return []
+
+        self.save_flow_file()
+        cmd = LiqCommands.FLOW.format(defaults_file=self.interpreter.defaults_file,
+                                      flow_file=self.flow_file_path)
+        started = time.perf_counter()
+        res = subprocess.run(cmd,
+                             shell=True,
+                             cwd=self.interpreter.dir_tree.parent_dir,
+                             capture_output=True)
+
+        results = self.map_results(res.stdout.decode(), res.returncode)
+        self.steps = []
+
+        for step in results:
+            if step['output']:
+                print(step['output'])
+            print(f'{step["step"]}: {step["status"]}')
+        print(f'Flow of {len(results)} steps finished with exit code {res.returncode} '
+              f'within {time.perf_counter() - started:.2f}s')
+        if res.returncode:
+            stderr = res.stderr.decode()
+            print(stderr)
+            failed = next((step['step'] for step in results if step['status'] == 'failed'), results[-1]['step'])
+            raise subprocess.CalledProcessError(res.returncode, f'{cmd} (step {failed})', stderr=stderr)
+
+        return results
+
+
 class LiqInterpreter:
 
     def __init__(self,
                  db_driver: DBAccess,
                  dir_tree: DirTree,
                  defaults_file,
-                 changelog_file):
-        self.os_user = os.getlogin()
+                 changelog_file,
+                 native_ddl=False,
+                 update_sql_file=None,
+                 change_log_table='databasechangelog'):
+        self.os_user = get_os_user()
         self.db_driver = db_driver
         self.dir_tree = dir_tree
         self.defaults_file = defaults_file
+        self.native_ddl = native_ddl
+        self.update_sql_file = update_sql_file
+        self.change_log_table = change_log_table
         self.change_log = ChangeLog(dir_tree.parent_dir, changelog_file)
+        self._project_state = None
+
+    @property
+    def project_state(self):
+        if self._project_state is None:
+            from .project_state import ProjectState
+
+            self._project_state = ProjectState(self.iliq_cache_path, self.dir_tree.parent_dir)
+
+        return self._project_state
+
+    def close_project_state(self):
+        if self._project_state is not None:
+            self._project_state.close()
 
     def __str__(self):
         res = (f'[\n {self.__class__.__name__} instance'
@@ -93,21 +245,25 @@ class LiqInterpreter:
     def iliq_cache_path(self):
         return os.path.join(self.dir_tree.parent_dir, _CACHE_DIR_NAME)
 
-    def generate_change_log(self):
-        dump_file_path = os.path.join(self.dir_tree.parent_dir, self.dump_file_name)
+    def generate_change_log(self, dump_file_path: str = None):
+        dump_file_path = dump_file_path or os.path.join(self.dir_tree.parent_dir, self.dump_file_name)
+        # generate-changelog refuses to overwrite an existing output file
+        if os.path.exists(dump_file_path):
+            os.remove(dump_file_path)
+
         cmd = LiqCommands.CHANGELOG_GEN_FROM_DB.format(changelog_file=dump_file_path,
                                                        defaults_file=self.defaults_file)
-        subprocess.run(cmd, shell=True, cwd=self.dir_tree.parent_dir,)
+        subprocess.run(cmd, shell=True, cwd=self.dir_tree.parent_dir, check=True)
 
     def create_liq_tables(self):
         cmd = LiqCommands.TAG_DATABASE.format(defaults_file=self.defaults_file,
                                               version='init_tag')
 
-        subprocess.run(cmd, shell=True, cwd=self.dir_tree.parent_dir)
+        subprocess.run(cmd, shell=True, cwd=self.dir_tree.parent_dir, check=True)
 
         self.db_driver.truncate_change_log()
 
-    def get_update_sql(self, contexts: list = None):
+    def stream_update_sql(self, contexts: list = None, tee=True):
         if contexts:
             cmd = LiqCommands.CONTEXT_UPDATE_SQL.format(context=','.join(contexts),
                                                         changelog_file=self.change_log.file_name,
@@ -115,27 +271,103 @@ class LiqInterpreter:
         else:
             cmd = LiqCommands.UPDATE_SQL.format(changelog_file=self.change_log.file_name,
                                                 defaults_file=self.defaults_file)
-        res = subprocess.run(cmd,
-                             shell=True,
-                             cwd=self.dir_tree.parent_dir,
-                             capture_output=True)
-
-        res = res.stdout.decode()
 
-        print(res)
+        import tempfile
+
+        tee_f = open(self.update_sql_file, 'w', encoding='utf-8') if self.update_sql_file else None
+        with tempfile.TemporaryFile() as err_f, subprocess.Popen(cmd,
+                                                                 shell=True,
+                                                                 cwd=self.dir_tree.parent_dir,
+                                                                 stdout=subprocess.PIPE,
+                                                                 stderr=err_f,
+                                                                 encoding='utf-8',
+                                                                 start_new_session=True) as proc:
+            try:
+                for line in proc.stdout:
+                    if tee:
+                        print(line, end='')
+                    if tee_f is not None:
+                        tee_f.write(line)
+                    yield line.rstrip('\r\n')
+            finally:
+                if tee_f is not None:
+                    tee_f.close()
+                if proc.poll() is None:
+                    terminate_process_tree(proc)
+
+            if proc.wait():
+                err_f.seek(0)
+                stderr = err_f.read().decode(errors='replace')
+                print(f'Liquibase update-sql exited with code {proc.returncode}\n{stderr}')
+                raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
 
-        return res
+    def get_update_sql(self, contexts: list = None):
+        return '\n'.join(self.stream_update_sql(contexts=contexts))
 
     def get_update_sql_changelog_dml(self, contexts: list = None):
-        upd_str = self.get_update_sql(contexts=contexts)
-        log_insert_pattern = re.compile('insert.*databasechangelog .*;', flags=re.IGNORECASE)
-        for cmd in upd_str.split(sep='\n'):
-            for c in re.findall(log_insert_pattern, cmd):
-                yield c
+        for line in self.stream_update_sql(contexts=contexts):
+            yield from _CHANGELOG_DML_PATTERN.findall(line)
 
     def upload_sql_changelog(self, contexts: list = None):
-        for cmd in self.get_update_sql_changelog_dml(contexts=contexts):
-            self.db_driver.execute_any_sql(cmd)
+        started = time.perf_counter()
+        batches_before = self.db_driver.batch_stats['batches']
+        insert_statements = {}
+        known_keys = {}
+        rows_count = 0
+        skipped = 0
+        with self.db_driver.batch(commit_batches=False) as batch:
+            for cmd in self.get_update_sql_changelog_dml(contexts=contexts):
+                insert = parse_changelog_insert(cmd)
+                if insert is None:
+                    batch.execute(cmd.rstrip().rstrip(';'))
+                    rows_count += 1
+                    continue
+
+                table, columns, shape, params = insert
+                key = changelog_row_key(columns, shape, params)
+                if key is not None:
+                    if table not in known_keys:
+                        known_keys[table] = self.db_driver.get_change_log_keys(table, batch.conn)
+                    if key in known_keys[table]:
+                        skipped += 1
+                        continue
+                    known_keys[table].add(key)
+
+                sql = insert_statements.get((table, columns, shape))
+                if sql is None:
+                    sql = self.db_driver.insert_sql(table, columns, shape)
+                    insert_statements[(table, columns, shape)] = sql
+
+                batch.execute(sql, *params)
+                rows_count += 1
+
+        elapsed = time.perf_counter() - started
+        print(f'Uploaded {rows_count} changelog rows in '
+              f'{self.db_driver.batch_stats["batches"] - batches_before} batches, '
+              f'skipped {skipped} already registered, '
+              f'within {elapsed:.2f}s ({rows_count / elapsed if elapsed else 0:.0f} rows/s)')
+
+    def get_status(self, contexts: list = None):
+        from .changelog_status import get_change_log_status
+
+        started = time.perf_counter()
+        status = get_change_log_status(self.dir_tree.parent_dir,
+                                       self.change_log.file_name,
+                                       self.db_driver.get_change_log_rows(self.change_log_table),
+                                       self.db_driver.rdbms_type,
+                                       contexts=contexts,
+                                       encoding=self.dir_tree.encoding,
+                                       state=self.project_state.open())
+        self.project_state.save()
+
+        for state in ('pending', 'changed', 'always', 'mismatched'):
+            for change_set_id, author, filename in status[state]:
+                print(f'{state:>10}  {change_set_id} ({author}) {filename}')
+        print(', '.join(f'{len(keys)} {state}' for state, keys in status.items()) +
+              f' within {time.perf_counter() - started:.2f}s '
+              f'({self.project_state.stats["hits"]} cached, {self.project_state.stats["misses"]} read files)')
+
+        return status
 
     def update(self, contexts: list = None):
         if contexts:
@@ -145,7 +377,7 @@ class LiqInterpreter:
         else:
             cmd = LiqCommands.UPDATE.format(changelog_file=self.change_log.file_name,
                                             defaults_file=self.defaults_file)
-        subprocess.run(cmd, shell=True, cwd=self.dir_tree.parent_dir)
+        subprocess.run(cmd, shell=True, cwd=self.dir_tree.parent_dir, check=True)
 
     def rollback(self, version: str, contexts: list = None):
         if contexts:
@@ -157,7 +389,7 @@ class LiqInterpreter:
             cmd = LiqCommands.ROLLBACK.format(changelog_file=self.change_log.file_name,
                                               defaults_file=self.defaults_file,
                                               version=version)
-        subprocess.run(cmd, shell=True, cwd=self.dir_tree.parent_dir)
+        subprocess.run(cmd, shell=True, cwd=self.dir_tree.parent_dir, check=True)
 
     def get_rollback_sql(self, version: str, contexts: list = None):
         if contexts:
@@ -167,7 +399,13 @@ class LiqInterpreter:
                                                   defaults_file=self.defaults_file,
                                                   version=version)
 
-        subprocess.run(cmd, shell=True, cwd=self.dir_tree.parent_dir)
+        subprocess.run(cmd, shell=True, cwd=self.dir_tree.parent_dir, check=True)
+
+    def flow(self):
+        return LiqFlow(self)
+
+    def release(self, version: str, contexts: list = None):
+        return self.flow().tag(version).update_sql(contexts).update(contexts).run()
 
     def put_tag(self, version: str):
         version_tag = VersionTag(change_set_id=version,
@@ -191,7 +429,8 @@ class LiqInterpreter:
                                change_sql_paths=[object_rec['sql_file_path']],
                                rollback_sql_paths=[object_rec.get('rollback_file_path')])
 
-        parent_path = os.path.join(self.dir_tree.united_liq_path, change_set.schema_name)
+        parent_path = self.dir_tree.ensure_dir(os.path.join(self.dir_tree.united_liq_path,
+                                                            change_set.schema_name))
         change_set.save_change_set(parent_path, self.dir_tree.encoding)
 
         self.change_log.add_change_set(change_set)
@@ -205,13 +444,23 @@ class LiqInterpreter:
     def print_change_log(self):
         print(self.change_log)
 
-    def init_project(self):
+    def put_tables_into_tree(self, dir_tree: DirTree):
+        if self.native_ddl:
+            yield from dir_tree.put_native_ddl_into_tree()
+            return
+
+        dump_file_path = os.path.join(dir_tree.parent_dir, self.dump_file_name)
+        self.generate_change_log(dump_file_path)
+
+        yield from dir_tree.put_ddl_file_into_tree(dump_file_path, use_mmap=True)
+
+    def init_project(self, incremental=False):
+        if incremental:
+            return self.sync_project()
 
         self.dir_tree.create_dir_tree(recreate=True)
-        self.generate_change_log()
 
-        dump_file_path = os.path.join(self.dir_tree.parent_dir, self.dump_file_name)
-        for object_rec in self.dir_tree.put_ddl_file_into_tree(dump_file_path):
+        for object_rec in self.put_tables_into_tree(self.dir_tree):
             self.put_change_set(object_rec)
 
         for func in (self.dir_tree.put_composite_types_into_tree,
@@ -221,6 +470,116 @@ class LiqInterpreter:
 
         self.save_change_log()
 
+        for line in self.dir_tree.format_pipeline_timings():
+            print(line)
+
+    def load_objects_cache(self, cache_file_name=_FINGERPRINTS_CACHE_FILE_NAME):
+        cache_path = os.path.join(self.iliq_cache_path, cache_file_name)
+        try:
+            with open(cache_path, 'r') as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return {}
+
+    def save_objects_cache(self, objects_cache: dict, cache_file_name=_FINGERPRINTS_CACHE_FILE_NAME):
+        os.makedirs(self.iliq_cache_path, exist_ok=True)
+        cache_path = os.path.join(self.iliq_cache_path, cache_file_name)
+        with open(cache_path, 'w') as f:
+            f.write(json.dumps(objects_cache))
+
+    def sync_project(self):
+        staging_path = os.path.join(self.iliq_cache_path, _STAGING_DIR_NAME)
+        os.makedirs(self.iliq_cache_path, exist_ok=True)
+
+        staging_tree = DirTree(self.db_driver,
+                               staging_path,
+                               changelog_type=self.dir_tree.changelog_type,
+                               rollbacks=self.dir_tree.rollbacks,
+                               tree_encoding=self.dir_tree.encoding,
+                               ddl_workers=self.dir_tree.ddl_workers,
+                               ddl_buffer_size=self.dir_tree.ddl_buffer_size,
+                               writer_threads=self.dir_tree.writer_threads,
+                               queue_depth=self.dir_tree.queue_depth,
+                               lazy_dirs=self.dir_tree.lazy_dirs)
+        staging_tree.create_dir_tree(recreate=True)
+
+        object_recs = list(self.put_tables_into_tree(staging_tree))
+        object_recs.extend(staging_tree.put_composite_types_into_tree())
+
+        state = self.project_state.open()
+        on_disk = set(self.dir_tree.iter_object_files())
+        report = {'added': [], 'changed': [], 'diverged': [], 'dropped': [], 'unchanged': 0}
+
+        fingerprints_cache = self.load_objects_cache(_FINGERPRINTS_CACHE_FILE_NAME)
+        fingerprints = {}
+        changed_keys = []
+        for fingerprint_rec in self.db_driver.get_fingerprints():
+            self.dir_tree.add_paths_to_object_rec(fingerprint_rec)
+            sql_file_path = fingerprint_rec['sql_file_path']
+            fingerprints[sql_file_path] = fingerprint_rec['fingerprint']
+
+            if sql_file_path in on_disk and fingerprints_cache.get(sql_file_path) == fingerprint_rec['fingerprint']:
+                on_disk.discard(sql_file_path)
+                report['unchanged'] += 1
+            else:
+                changed_keys.append(fingerprint_rec['object_key'])
+
+        object_recs.extend(staging_tree.put_records_into_tree(self.db_driver.get_objects_by_keys(changed_keys),
+                                                              'views_routines_triggers'))
+        object_recs = list({object_rec['sql_file_path']: object_rec for object_rec in object_recs}.values())
+
+        for object_rec in object_recs:
+            sql_file_path = object_rec['sql_file_path']
+            staged_path = os.path.join(staging_path, sql_file_path)
+            target_path = os.path.join(self.dir_tree.parent_dir, sql_file_path)
+
+            digest = file_digest(staged_path)
+            old_digest = state.digest(sql_file_path) if sql_file_path in on_disk else None
+            on_disk.discard(sql_file_path)
+
+            if digest == old_digest:
+                report['unchanged'] += 1
+                continue
+
+            # the applied changeset would fail checksum validation, the change needs its own changeset
+            if old_digest is not None and not DDLTypesMap[object_rec['object_type']].run_on_change:
+                report['diverged'].append(sql_file_path)
+                continue
+
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            os.replace(staged_path, target_path)
+            state.record_digest(sql_file_path, digest)
+
+            if old_digest is None:
+                os.makedirs(os.path.join(self.dir_tree.united_liq_path, object_rec['schema_name']), exist_ok=True)
+                self.put_change_set(object_rec)
+                report['added'].append(sql_file_path)
+            else:
+                report['changed'].append(sql_file_path)
+
+        for sql_file_path in sorted(on_disk):
+            report['dropped'].append(sql_file_path)
+
+        rmtree(staging_path)
+        state.save()
+        self.save_objects_cache(fingerprints)
+        if report['added']:
+            self.save_change_log()
+
+        for k in ('added', 'changed', 'diverged', 'dropped'):
+            for sql_file_path in report[k]:
+                print(f'{k}: {sql_file_path}')
+        if report['diverged']:
+            print(f'{len(report["diverged"])} objects without runOnChange differ from the database, '
+                  f'their files were kept: add new changesets for these changes')
+        for line in staging_tree.format_pipeline_timings():
+            print(line)
+        print(f'Sync finished: {len(report["added"])} added, {len(report["changed"])} changed, '
+              f'{len(report["diverged"])} diverged, {len(report["dropped"])} dropped, '
+              f'{report["unchanged"]} unchanged')
+
+        return report
+
     def save_cache(self):
         if not os.path.exists(self.iliq_cache_path):
             os.mkdir(self.iliq_cache_path)
@@ -232,9 +591,104 @@ class LiqInterpreter:
         }
         cache = json.dumps(cache)
         cache_path = os.path.join(self.iliq_cache_path, _CACHE_FILE_NAME)
-        if not os.path.exists(cache_path):
-            with open(cache_path, 'w') as f:
-                f.write(cache)
+        with open(f'{cache_path}.{os.getpid()}', 'w') as f:
+            f.write(cache)
+        os.replace(f'{cache_path}.{os.getpid()}', cache_path)
+
+    def compact_cache(self):
+        res = self.project_state.compact()
+        print(f'Project state compacted: {res["removed"]} stale files removed, {res["kept"]} kept, '
+              f'{res["size_before"] / 1024:.0f}KB -> {res["size_after"] / 1024:.0f}KB')
+
+        return res
+
+
+def get_os_user():
+    try:
+        return os.getlogin()
+    except OSError:
+        import getpass
+
+        return getpass.getuser()
+
+
+def terminate_process_tree(proc: subprocess.Popen):
+    # with shell=True proc is the shell, Liquibase's JVM is its child in the same session
+    if os.name != 'posix':
+        proc.terminate()
+        return
+
+    import signal
+
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+def file_digest(file_path: str):
+    import hashlib
+
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def split_sql_values(values: str):
+    depth = 0
+    parts = []
+    current = []
+    for token in _SQL_VALUE_TOKEN_PATTERN.findall(values):
+        if token == ',' and not depth:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        current.append(token)
+
+    parts.append(''.join(current).strip())
+    return parts
+
+
+def parse_changelog_insert(cmd: str):
+    insert = _CHANGELOG_INSERT_PATTERN.match(cmd)
+    if insert is None:
+        return None
+
+    columns = ', '.join(c.strip() for c in insert.group('columns').split(','))
+    values = split_sql_values(insert.group('values'))
+    if len(values) != columns.count(',') + 1:
+        return None
+
+    shape = []
+    params = []
+    for value in values:
+        if len(value) > 1 and value[0] == value[-1] == "'" and "'" not in value[1:-1].replace("''", ''):
+            shape.append(None)
+            params.append(value[1:-1].replace("''", "'"))
+        elif value.upper() == 'NULL':
+            shape.append(None)
+            params.append(None)
+        elif _SQL_INTEGER_PATTERN.fullmatch(value):
+            shape.append(None)
+            params.append(int(value))
+        else:
+            shape.append(value)
+
+    return insert.group('table'), columns, tuple(shape), tuple(params)
+
+
+def changelog_row_key(columns: str, shape: tuple, params: tuple):
+    row = {}
+    values = iter(params)
+    for column, expression in zip(columns.split(', '), shape):
+        row[column.strip('"').upper()] = next(values) if expression is None else None
+
+    key = (row.get('ID'), row.get('AUTHOR'), row.get('FILENAME'))
+    return None if None in key else key
 
 
 def get_iliq_cache(parent_path):
@@ -310,7 +764,22 @@ class LiqInterface:
                                        13, 'Prints Iliq instance properties'),
                              'help': (self.run_command,
                                       self.print_help,
-                                      14, 'Prints this message')}
+                                      14, 'Prints this message'),
+                             'sync_project': (self.run_command,
+                                              self.interpreter.sync_project,
+                                              15, 'Re-syncs the project with the database, '
+                                              'rewriting only changed objects (incremental init_project)'),
+                             'release': (self.run_release,
+                                         self.interpreter.release,
+                                         16, 'Tags database, shows and applies current changes '
+                                         'in a single Liquibase run'),
+                             'status': (self.run_context_command,
+                                        self.interpreter.get_status,
+                                        17, 'Lists pending, changed and always-run changesets '
+                                        'without launching Liquibase'),
+                             'compact_cache': (self.run_command,
+                                               self.interpreter.compact_cache,
+                                               18, 'Drops state of deleted files from the project cache')}
 
     @property
     def dir_tree(self):
@@ -335,6 +804,9 @@ class LiqInterface:
     def cmd_lookup(self, cmd):
         if cmd in self.commands_map:
             return cmd
+
+        from difflib import get_close_matches
+
         matches = get_close_matches(cmd, self.commands_map, 3, cutoff=0.4)
         if matches:
             print('Exact command is not found; closest options: \n', '\n'.join(matches))
@@ -350,11 +822,14 @@ class LiqInterface:
             cmd = input('>>> ')
             cmd = format_cmd(cmd)
             cmd = self.cmd_lookup(cmd)
-            if cmd:
-                self.commands_map[cmd][0](cmd)
-            else:
+            if not cmd:
                 continue
 
+            try:
+                self.commands_map[cmd][0](cmd)
+            except subprocess.CalledProcessError as e:
+                print(f'Liquibase failed with exit code {e.returncode}')
+
     @staticmethod
     def ask_for_contexts():
         contexts = []
@@ -403,6 +878,11 @@ class LiqInterface:
         version = format_cmd(input('>>> enter version to rollback: '))
         self.commands_map[cmd][1](version, contexts)
 
+    def run_release(self, cmd):
+        contexts = self.ask_for_contexts()
+        version = format_cmd(input('>>> enter a release version tag: '))
+        self.commands_map[cmd][1](version, contexts)
+
     def exit(self):
         answer = True
         if not self.interpreter.change_log.saved:
@@ -411,17 +891,16 @@ class LiqInterface:
 
         if answer:
             self.interpreter.save_cache()
+            self.interpreter.close_project_state()
+            print(self.db_driver.format_pool_stats())
+            if self.db_driver.batch_stats['batches']:
+                print(self.db_driver.format_batch_stats())
+            self.db_driver.close_conn()
             print(f'Closing liquibase session for {self.db_driver.db_name}')
             exit()
 
 
-def cli_startup():
-
-    print('Hello there!\nLet''s prepare Iliq instance...')
-    env_path = input('Enter .env file path: ')
-    env_path = Path(format_cmd(env_path))
-    load_dotenv(dotenv_path=env_path)
-
+def build_interpreter():
     project_path = get_project_path()
     cache = get_iliq_cache(project_path)
 
@@ -431,18 +910,26 @@ def cli_startup():
         rollbacks = cache['rollbacks']
         tree_encoding = cache['dir_tree_encoding']
     else:
-        rdbms_types = ', '.join([t.name for t in RDBMSTypes])
-        rdbms_type = input(f'Enter RDBMS type ({rdbms_types} are supported): ')
+        rdbms_type = os.environ.get('ILIQ_RDBMS_TYPE')
+        if not rdbms_type:
+            rdbms_types = ', '.join([t.name for t in RDBMSTypes])
+            rdbms_type = input(f'Enter RDBMS type ({rdbms_types} are supported): ')
         rdbms_type = format_cmd(rdbms_type)
 
-        changelog_types = ', '.join([t.name for t in ChangelogTypes])
-        changelog_type = input(f'Enter Changlog type ({changelog_types} are supported): ')
+        changelog_type = os.environ.get('ILIQ_CHANGELOG_TYPE')
+        if not changelog_type:
+            changelog_types = ', '.join([t.name for t in ChangelogTypes])
+            changelog_type = input(f'Enter Changlog type ({changelog_types} are supported): ')
         changelog_type = ChangelogTypes[format_cmd(changelog_type)]
 
-        rollbacks = input(f'Rollbacks support? (y/n): ')
+        rollbacks = os.environ.get('ILIQ_ROLLBACKS')
+        if not rollbacks:
+            rollbacks = input(f'Rollbacks support? (y/n): ')
         rollbacks = y_n_bool(rollbacks)
 
-        tree_encoding = input('Enter project directory tree encoding: ')
+        tree_encoding = os.environ.get('ILIQ_TREE_ENCODING')
+        if not tree_encoding:
+            tree_encoding = input('Enter project directory tree encoding: ')
         tree_encoding = format_cmd(tree_encoding)
 
     db_driver = get_db_driver(rdbms_type)
@@ -450,7 +937,11 @@ def cli_startup():
                        project_path,
                        changelog_type=changelog_type,
                        rollbacks=rollbacks,
-                       tree_encoding=tree_encoding)
+                       tree_encoding=tree_encoding,
+                       ddl_workers=int(os.environ.get('ILIQ_DDL_WORKERS', 1)),
+                       writer_threads=int(os.environ.get('ILIQ_WRITER_THREADS', 4)),
+                       queue_depth=int(os.environ.get('ILIQ_QUEUE_DEPTH', 64)),
+                       lazy_dirs=y_n_bool(os.environ.get('ILIQ_LAZY_DIRS', 'n')))
 
     properties_file_name = os.environ.get('ILIQ_PROPERTIES_FILE')
     if not properties_file_name:
@@ -462,7 +953,31 @@ def cli_startup():
         change_log_file_name = input('Enter general changelog file name: ')
     change_log_file_name = format_cmd(change_log_file_name)
 
-    iliq = LiqInterpreter(db_driver, dir_tree, properties_file_name, change_log_file_name)
+    iliq = LiqInterpreter(db_driver,
+                          dir_tree,
+                          properties_file_name,
+                          change_log_file_name,
+                          native_ddl=y_n_bool(os.environ.get('ILIQ_NATIVE_DDL', 'n')),
+                          update_sql_file=os.environ.get('ILIQ_UPDATE_SQL_FILE'),
+                          change_log_table=os.environ.get('ILIQ_CHANGELOG_TABLE', 'databasechangelog'))
+
+    return iliq
+
+
+def cli_startup():
+    if len(sys.argv) > 1:
+        from .script import main
+
+        return main(sys.argv[1:])
+
+    from dotenv import load_dotenv
+
+    print('Hello there!\nLet''s prepare Iliq instance...')
+    env_path = input('Enter .env file path: ')
+    env_path = Path(format_cmd(env_path))
+    load_dotenv(dotenv_path=env_path)
+
+    iliq = build_interpreter()
     server = LiqInterface(iliq)
 
     print()
@@ -0,0 +1,226 @@
+import oracledb
+
+from .db_connectors import DBAccess, RDBMSTypes
+from .sql_commands import OracleSQLCommands
+
+
+_IN_LIST_LIMIT = 1000
+_OBJECT_ORDER = ('object_id',)
+_NATIVE_DDL_ORDER = ('created', 'object_id')
+
+
+class OracleSQLAccess(DBAccess):
+
+    SQL = OracleSQLCommands
+
+    def __init__(self,
+                 user_name: str,
+                 password: str,
+                 db_name: str,  #  service_name
+                 host: str,
+                 port=1521,
+                 arraysize=500,
+                 prefetchrows=501,
+                 extract_workers=1,
+                 pool_min_size=0,
+                 pool_max_size=0,
+                 batch_size=1000):
+        self.rdbms_type = RDBMSTypes.oracle.name
+        self.user_name = user_name
+        self.password = password
+        self.db_name = db_name
+        self.host = host
+        self.port = port
+        self.arraysize = arraysize
+        self.prefetchrows = prefetchrows
+        self.extract_workers = extract_workers
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.batch_size = batch_size
+        self.pool: oracledb.ConnectionPool = None
+        self.pool_stats = {'checkouts': 0, 'wait': 0.0, 'max_wait': 0.0, 'reconnects': 0, 'reconnect_failures': 0}
+        self.batch_stats = {'batches': 0, 'statements': 0, 'time': 0.0}
+        self.conn: oracledb.Connection = None
+
+    @staticmethod
+    def fetch_lob_as_string(cursor: oracledb.Cursor, metadata: oracledb.FetchInfo):
+        if metadata.type_code is oracledb.DB_TYPE_CLOB:
+            return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+        if metadata.type_code is oracledb.DB_TYPE_NCLOB:
+            return cursor.var(oracledb.DB_TYPE_LONG_NVARCHAR, arraysize=cursor.arraysize)
+
+    def init_session(self, conn: oracledb.Connection, requested_tag=None):
+        with conn.cursor() as cur:
+            cur.execute(self.SQL.metadata_session_setup.value)
+
+    @staticmethod
+    def set_row_factory(cursor: oracledb.Cursor):
+        # unquoted aliases come back uppercase, rows are keyed like the PostgreSQL ones
+        columns = [col[0].lower() for col in cursor.description]
+        cursor.rowfactory = lambda *args: dict(zip(columns, args))
+        return cursor
+
+    @property
+    def conn_str(self):
+        return oracledb.ConnectParams(host=self.host, port=self.port, service_name=self.db_name)
+
+    def connect(self):
+        if not self.connected:
+            self.conn = oracledb.connect(user=self.user_name,
+                                         password=self.password,
+                                         params=self.conn_str)
+            self.conn.outputtypehandler = self.fetch_lob_as_string
+            self.init_session(self.conn)
+
+    def open_pool(self):
+        return oracledb.create_pool(user=self.user_name,
+                                    password=self.password,
+                                    params=self.conn_str,
+                                    min=self.pool_min_size,
+                                    max=self.pool_max_size,
+                                    increment=1,
+                                    ping_interval=60,
+                                    getmode=oracledb.POOL_GETMODE_WAIT,
+                                    session_callback=self.init_session)
+
+    def pool_connection(self):
+        conn = self.pool.acquire()
+        conn.outputtypehandler = self.fetch_lob_as_string
+        return conn
+
+    def connection_healthy(self, conn: oracledb.Connection) -> bool:
+        try:
+            conn.ping()
+        except oracledb.Error:
+            return False
+
+        return True
+
+    def bind_marker(self, position: int) -> str:
+        return f':{position + 1}'
+
+    def run_batch(self, conn: oracledb.Connection, statements: list):
+        with conn.cursor() as cur:
+            for sql, rows in statements:
+                if rows is None:
+                    cur.execute(sql)
+                else:
+                    cur.executemany(sql, rows)
+
+    def select_rows(self, sql: str, params=None):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.arraysize = self.arraysize
+                cur.prefetchrows = self.prefetchrows
+                cur.execute(sql, params)
+                cur = self.set_row_factory(cur)
+                for line in cur:
+                    yield line
+
+    async def connect_async(self):
+        conn = await oracledb.connect_async(user=self.user_name,
+                                            password=self.password,
+                                            params=self.conn_str)
+        conn.outputtypehandler = self.fetch_lob_as_string
+        with conn.cursor() as cur:
+            await cur.execute(self.SQL.metadata_session_setup.value)
+
+        return conn
+
+    async def select_batches_async(self, conn: oracledb.AsyncConnection, sql: str, params=None):
+        with conn.cursor() as cur:
+            cur.arraysize = self.arraysize
+            cur.prefetchrows = self.prefetchrows
+            await cur.execute(sql, params)
+            cur = self.set_row_factory(cur)
+            while rows := await cur.fetchmany():
+                yield rows
+
+    def get_all_schemas(self):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(self.SQL.schema_list_select.value, {'schema_name': None})
+                schemas = [r[0] for r in cur.fetchall()]
+
+        return schemas
+
+    def get_schema(self, schema_name):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(self.SQL.schema_list_select.value, {'schema_name': schema_name})
+                schema = cur.fetchone()[0]
+
+        return schema
+
+    def get_all_procedures(self):
+        yield from self.select_rows_by_schema(self.SQL.routines_text_select.value, _OBJECT_ORDER)
+
+    def get_all_triggers(self):
+        yield from self.select_rows_by_schema(self.SQL.triggers_text_select.value, _OBJECT_ORDER)
+
+    def get_all_mat_views(self):
+        yield from self.select_rows_by_schema(self.SQL.materialized_views_select.value, _OBJECT_ORDER)
+
+    def get_all_composite_types(self):
+        yield from self.select_rows_by_schema(self.SQL.object_types_select.value, _OBJECT_ORDER)
+
+    def get_views_routines_triggers(self):
+        yield from self.select_rows_by_schema(self.SQL.views_routines_triggers_select.value, _OBJECT_ORDER)
+
+    def get_native_ddl(self):
+        for sql in (self.SQL.sequences_ddl_select,
+                    self.SQL.tables_ddl_select,
+                    self.SQL.indexes_ddl_select):
+            yield from self.select_rows_by_schema(sql.value, _NATIVE_DDL_ORDER)
+
+    def get_fingerprints(self):
+        yield from self.select_rows(self.SQL.catalog_fingerprint_select.value, {'schema_name': None})
+
+    def get_objects_by_keys(self, object_keys: list):
+        for start in range(0, len(object_keys), _IN_LIST_LIMIT):
+            keys = object_keys[start:start + _IN_LIST_LIMIT]
+            sql = self.SQL.catalog_by_keys_select.value.format(
+                object_keys=', '.join(self.bind_marker(i) for i in range(len(keys))))
+            yield from self.select_rows(sql, keys)
+
+    def delete_change_set(self,
+                          change_set_id: str,
+                          change_log_schema: str):
+        if not change_set_id:
+            raise ValueError
+
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                sql_cmd = self.SQL.databasechangelog_delete.value.format(schema_name=change_log_schema)
+                cur.execute(sql_cmd, (change_set_id,))
+
+            conn.commit()
+
+    def delete_change_sets(self,
+                           change_set_ids: list,
+                           change_log_schema: str):
+        if not all(change_set_ids):
+            raise ValueError
+
+        sql_cmd = self.SQL.databasechangelog_delete.value.format(schema_name=change_log_schema)
+        self.execute_many_sql(sql_cmd, [(change_set_id,) for change_set_id in change_set_ids])
+
+    def truncate_change_log(self, change_log_schema: str):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                sql_cmd = self.SQL.databasechangelog_delete.value.format(schema_name=change_log_schema)
+                cur.execute(sql_cmd,
+                            (None,))
+
+            conn.commit()
+
+    def execute_any_sql(self, sql: str, *params, commit=True):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+
+            if commit:
+                conn.commit()
+            elif self.pooled:
+                # the connection goes back to the pool, uncommitted work cannot outlive the call
+                conn.rollback()
@@ -0,0 +1,223 @@
+import psycopg
+from psycopg.rows import dict_row
+
+from itertools import count
+from contextlib import nullcontext
+from .db_connectors import DBAccess, RDBMSTypes
+from .sql_commands import PostgreSQLCommands
+
+
+_CURSOR_NUMBERS = count()
+_OBJECT_ORDER = ('oid',)
+_CONSTRAINT_ORDER = ('is_foreign_key', 'oid')
+
+
+class PostgreSQLAccess(DBAccess):
+
+    SQL = PostgreSQLCommands
+
+    def __init__(self,
+                 user_name: str,
+                 password: str,
+                 db_name: str,
+                 host: str,
+                 port=5432,
+                 itersize=100,
+                 extract_workers=1,
+                 pool_min_size=0,
+                 pool_max_size=0,
+                 batch_size=1000):
+        self.rdbms_type = RDBMSTypes.postgresql.name
+        self.user_name = user_name
+        self.password = password
+        self.db_name = db_name
+        self.host = host
+        self.port = port
+        self.itersize = itersize
+        self.extract_workers = extract_workers
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.batch_size = batch_size
+        self.pool = None
+        self.pool_stats = {'checkouts': 0, 'wait': 0.0, 'max_wait': 0.0, 'reconnects': 0, 'reconnect_failures': 0}
+        self.batch_stats = {'batches': 0, 'statements': 0, 'time': 0.0}
+        self.conn: psycopg.Connection = None
+
+    @property
+    def conn_str(self):
+        return 'host={} port={} dbname={} user={} password={}'.format(self.host,
+                                                                      self.port,
+                                                                      self.db_name,
+                                                                      self.user_name,
+                                                                      self.password)
+
+    def connect(self):
+        if not self.conn:
+            self.conn = psycopg.connect(self.conn_str)
+
+    def open_pool(self):
+        from psycopg_pool import ConnectionPool
+
+        return ConnectionPool(self.conn_str,
+                              min_size=self.pool_min_size,
+                              max_size=self.pool_max_size,
+                              check=self.check_pool_connection,
+                              reconnect_failed=self.count_reconnect_failure,
+                              open=True)
+
+    def check_pool_connection(self, conn: psycopg.Connection):
+        try:
+            self.pool.check_connection(conn)
+        except Exception:
+            # the pool discards the connection and hands out a new one
+            self.pool_stats['reconnects'] += 1
+            raise
+
+    def count_reconnect_failure(self, pool):
+        self.pool_stats['reconnect_failures'] += 1
+
+    def pool_connection(self):
+        return self.pool.connection()
+
+    def connection_healthy(self, conn: psycopg.Connection) -> bool:
+        # conn.closed only turns true after a failed call, a round trip notices a server-side drop
+        idle = conn.info.transaction_status == psycopg.pq.TransactionStatus.IDLE and not conn.autocommit
+        try:
+            if idle:
+                conn.autocommit = True
+            conn.execute('select 1')
+        except psycopg.Error:
+            return False
+        finally:
+            if idle and not conn.closed:
+                conn.autocommit = False
+
+        return True
+
+    def bind_marker(self, position: int) -> str:
+        return '%s'
+
+    def inline_sql(self, sql: str) -> str:
+        return sql.replace('%', '%%')
+
+    def run_batch(self, conn: psycopg.Connection, statements: list):
+        with conn.pipeline() if psycopg.Pipeline.is_supported() else nullcontext():
+            with conn.cursor() as cur:
+                for sql, rows in statements:
+                    if rows is None:
+                        cur.execute(sql)
+                    elif len(rows) == 1:
+                        cur.execute(sql, rows[0], prepare=True)
+                    else:
+                        cur.executemany(sql, rows)
+
+    def select_rows(self, sql: str, params=None):
+        with self.connection() as conn:
+            with conn.cursor(name=f'iliq_cursor_{next(_CURSOR_NUMBERS)}', row_factory=dict_row) as cur:
+                cur.itersize = self.itersize
+                cur.execute(sql, params)
+                for line in cur:
+                    yield line
+
+    async def connect_async(self):
+        return await psycopg.AsyncConnection.connect(self.conn_str)
+
+    async def select_batches_async(self, conn: psycopg.AsyncConnection, sql: str, params=None):
+        # every connection runs the same query once per schema: a prepared client cursor plans it once,
+        # at the cost of holding one schema's result in memory instead of streaming it
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute(sql, params, prepare=True)
+            while rows := await cur.fetchmany(self.itersize):
+                yield rows
+
+    def get_all_schemas(self):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(self.SQL.schema_list_select.value, {'schema_name': None})
+                schemas = [r[0] for r in cur.fetchall()]
+
+        return schemas
+
+    def get_schema(self, schema_name):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(self.SQL.schema_list_select.value, {'schema_name': schema_name})
+                schema = cur.fetchone()[0]
+
+        return schema
+
+    def get_all_procedures(self):
+        yield from self.select_rows_by_schema(self.SQL.routines_text_select.value, _OBJECT_ORDER)
+
+    def get_all_triggers(self):
+        yield from self.select_rows_by_schema(self.SQL.triggers_text_select.value, _OBJECT_ORDER)
+
+    def get_all_mat_views(self):
+        yield from self.select_rows_by_schema(self.SQL.materialized_views_select.value, _OBJECT_ORDER)
+
+    def get_all_composite_types(self):
+        yield from self.select_rows_by_schema(self.SQL.object_types_select.value, _OBJECT_ORDER)
+
+    def get_views_routines_triggers(self):
+        yield from self.select_rows_by_schema(self.SQL.views_routines_triggers_select.value, _OBJECT_ORDER)
+
+    def get_native_ddl(self):
+        for sql, order_by in ((self.SQL.sequences_ddl_select, _OBJECT_ORDER),
+                              (self.SQL.tables_ddl_select, _OBJECT_ORDER),
+                              (self.SQL.indexes_ddl_select, _OBJECT_ORDER),
+                              (self.SQL.constraints_ddl_select, _CONSTRAINT_ORDER)):
+            yield from self.select_rows_by_schema(sql.value, order_by)
+
+    def get_fingerprints(self):
+        sql = self.SQL.catalog_fingerprint_select.value.format(
+            catalog_select=self.SQL.views_routines_triggers_select.value)
+        yield from self.select_rows(sql, {'schema_name': None})
+
+    def get_objects_by_keys(self, object_keys: list):
+        if not object_keys:
+            return
+
+        yield from self.select_rows(self.SQL.catalog_by_keys_select.value, {'object_keys': object_keys})
+
+    def delete_change_set(self,
+                          change_set_id: str,
+                          change_log_schema: str = 'public'):
+        if not change_set_id:
+            raise ValueError
+
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                sql_cmd = self.SQL.databasechangelog_delete.value.format(schema_name=change_log_schema)
+                cur.execute(sql_cmd,
+                            (change_set_id,))
+
+            conn.commit()
+
+    def delete_change_sets(self,
+                           change_set_ids: list,
+                           change_log_schema: str = 'public'):
+        if not all(change_set_ids):
+            raise ValueError
+
+        sql_cmd = self.SQL.databasechangelog_delete.value.format(schema_name=change_log_schema)
+        self.execute_many_sql(sql_cmd, [(change_set_id,) for change_set_id in change_set_ids])
+
+    def truncate_change_log(self, change_log_schema: str = 'public'):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                sql_cmd = self.SQL.databasechangelog_delete.value.format(schema_name=change_log_schema)
+                cur.execute(sql_cmd,
+                            (None,))
+
+            conn.commit()
+
+    def execute_any_sql(self, sql, *params, commit=True):
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+
+            if commit:
+                conn.commit()
+            elif self.pooled:
+                # the connection goes back to the pool, uncommitted work cannot outlive the call
+                conn.rollback()
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+
+_STATE_FILE_NAME = '__project_state__.sqlite3'
+
+_STATE_TABLE_CREATE = '''
+create table if not exists file_state (
+    path text primary key,
+    size integer not null,
+    mtime_ns integer not null,
+    digest text,
+    checksum_params text,
+    checksum text,
+    document text
+)
+'''
+
+_STATE_SELECT = 'select path, size, mtime_ns, digest, checksum_params, checksum, document from file_state'
+
+_STATE_UPSERT = '''
+insert into file_state (path, size, mtime_ns, digest, checksum_params, checksum, document)
+values (?, ?, ?, ?, ?, ?, ?)
+on conflict (path) do update set size = excluded.size,
+                                 mtime_ns = excluded.mtime_ns,
+                                 digest = excluded.digest,
+                                 checksum_params = excluded.checksum_params,
+                                 checksum = excluded.checksum,
+                                 document = excluded.document
+'''
+
+_SIZE, _MTIME, _DIGEST, _CHECKSUM_PARAMS, _CHECKSUM, _DOCUMENT = range(6)
+
+
+class ProjectState:
+
+    def __init__(self,
+                 cache_path: str,
+                 parent_path: str,
+                 busy_timeout=5000):
+        self.cache_path = cache_path
+        self.parent_path = parent_path
+        self.busy_timeout = busy_timeout
+        self.conn = None
+        self.files = {}
+        self.dirty = set()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @property
+    def db_path(self):
+        return os.path.join(self.cache_path, _STATE_FILE_NAME)
+
+    def open(self):
+        if self.conn is not None:
+            return self
+
+        os.makedirs(self.cache_path, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout / 1000, isolation_level=None)
+        self.conn.execute('pragma journal_mode = wal')
+        self.conn.execute('pragma synchronous = normal')
+        self.conn.execute(f'pragma busy_timeout = {int(self.busy_timeout)}')
+        self.conn.execute(_STATE_TABLE_CREATE)
+        self.files = {row[0]: list(row[1:]) for row in self.conn.execute(_STATE_SELECT)}
+
+        return self
+
+    def entry(self, path: str):
+        stat = os.stat(os.path.join(self.parent_path, path))
+        entry = self.files.get(path)
+        if entry is not None and entry[_SIZE] == stat.st_size and entry[_MTIME] == stat.st_mtime_ns:
+            self.stats['hits'] += 1
+            return entry
+
+        self.stats['misses'] += 1
+        entry = [stat.st_size, stat.st_mtime_ns, None, None, None, None]
+        self.files[path] = entry
+        self.dirty.add(path)
+
+        return entry
+
+    def read_bytes(self, path: str, entry: list):
+        with open(os.path.join(self.parent_path, path), 'rb') as f:
+            data = f.read()
+
+        if entry[_DIGEST] is None:
+            entry[_DIGEST] = hashlib.sha1(data).hexdigest()
+            self.dirty.add(path)
+
+        return data
+
+    def digest(self, path: str):
+        path = os.path.normpath(path)
+        entry = self.entry(path)
+        if entry[_DIGEST] is None:
+            self.read_bytes(path, entry)
+
+        return entry[_DIGEST]
+
+    def checksum(self, path: str, params: str, compute):
+        path = os.path.normpath(path)
+        entry = self.entry(path)
+        if entry[_CHECKSUM] is None or entry[_CHECKSUM_PARAMS] != params:
+            entry[_CHECKSUM] = compute(self.read_bytes(path, entry))
+            entry[_CHECKSUM_PARAMS] = params
+            self.dirty.add(path)
+
+        return entry[_CHECKSUM]
+
+    def document(self, path: str, load, encoding='utf-8'):
+        path = os.path.normpath(path)
+        entry = self.entry(path)
+        if entry[_DOCUMENT] is not None:
+            return json.loads(entry[_DOCUMENT])
+
+        document = load(self.read_bytes(path, entry).decode(encoding))
+        entry[_DOCUMENT] = json.dumps(document, separators=(',', ':'))
+        self.dirty.add(path)
+
+        return document
+
+    def record_digest(self, path: str, digest: str):
+        path = os.path.normpath(path)
+        entry = self.entry(path)
+        if entry[_DIGEST] != digest:
+            # checksum and document were derived from the old content
+            entry[_DIGEST:] = [digest, None, None, None]
+            self.dirty.add(path)
+
+    def save(self):
+        if self.conn is None or not self.dirty:
+            return
+
+        rows = [(path, *self.files[path]) for path in self.dirty]
+        self.conn.execute('begin immediate')
+        try:
+            self.conn.executemany(_STATE_UPSERT, rows)
+            self.conn.execute('commit')
+        except Exception:
+            self.conn.execute('rollback')
+            raise
+
+        self.dirty.clear()
+
+    def compact(self):
+        self.open()
+        self.save()
+
+        removed = [path for path in self.files if not os.path.exists(os.path.join(self.parent_path, path))]
+        self.conn.execute('begin immediate')
+        try:
+            self.conn.executemany('delete from file_state where path = ?', [(path,) for path in removed])
+            self.conn.execute('commit')
+        except Exception:
+            self.conn.execute('rollback')
+            raise
+
+        for path in removed:
+            del self.files[path]
+
+        size_before = os.path.getsize(self.db_path)
+        self.conn.execute('vacuum')
+        self.conn.execute('pragma wal_checkpoint(truncate)')
+
+        return {'removed': len(removed),
+                'kept': len(self.files),
+                'size_before': size_before,
+                'size_after': os.path.getsize(self.db_path)}
+
+    def close(self):
+        if self.conn is not None:
+            self.save()
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import shlex
+import sys
+import time
+import traceback
+
+from .liqui import LiqInterface, build_interpreter
+
+
+class _CommandParser(argparse.ArgumentParser):
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+def build_command_parser():
+    parser = _CommandParser(prog='iliq', add_help=False)
+    parser.add_argument('command')
+    parser.add_argument('version', nargs='?')
+    parser.add_argument('--contexts', default=None,
+                        help='comma separated Liquibase contexts')
+    parser.add_argument('--object-type', default=None)
+    parser.add_argument('--schema-name', default=None)
+    parser.add_argument('--object-name', default=None)
+    return parser
+
+
+def iter_script_commands(script_f):
+    for line in script_f:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield shlex.split(line)
+
+
+def call_command(interface: LiqInterface, cmd: str, args: argparse.Namespace):
+    if cmd not in interface.commands_map:
+        raise ValueError(f'Unknown command {cmd}')
+
+    handler, func = interface.commands_map[cmd][:2]
+    contexts = args.contexts.split(',') if args.contexts else None
+
+    if handler == interface.run_command:
+        return func()
+    if handler == interface.run_context_command:
+        return func(contexts)
+    if handler == interface.run_add_changeset:
+        object_rec = {'object_type': args.object_type,
+                      'schema_name': args.schema_name,
+                      'object_name': args.object_name}
+        if None in object_rec.values():
+            raise ValueError(f'{cmd} requires --object-type, --schema-name and --object-name')
+        interface.dir_tree.add_paths_to_object_rec(object_rec)
+        return func(object_rec)
+
+    if not args.version:
+        raise ValueError(f'{cmd} requires a version argument')
+    if handler == interface.run_add_tag:
+        return func(args.version)
+    return func(args.version, contexts)
+
+
+def run_step(interface: LiqInterface, parser: argparse.ArgumentParser, number: int, argv: list):
+    res = {'step': number,
+           'command': argv[0] if argv else None,
+           'args': argv[1:],
+           'status': 'failed',
+           'result': None,
+           'error': None}
+    started = time.perf_counter()
+    try:
+        args = parser.parse_args(argv)
+        res['result'] = call_command(interface, args.command, args)
+        res['status'] = 'ok'
+    except EOFError:
+        res['error'] = 'EOFError: command needs interactive input which is not available in script mode'
+    except Exception as e:
+        res['error'] = f'{type(e).__name__}: {e}'
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    res['duration'] = time.perf_counter() - started
+    return res
+
+
+def write_result(results_f, res: dict):
+    results_f.write(json.dumps(res, default=str) + '\n')
+    results_f.flush()
+
+
+def run_script(commands, keep_going=False, results_f=None):
+    results_f = results_f or sys.stdout
+    started = time.perf_counter()
+    interface = None
+    steps = failed = 0
+    try:
+        interface = LiqInterface(build_interpreter())
+        parser = build_command_parser()
+
+        for argv in commands:
+            if argv and argv[0] == 'exit':
+                break
+
+            steps += 1
+            res = run_step(interface, parser, steps, argv)
+            write_result(results_f, res)
+            if res['status'] != 'ok':
+                failed += 1
+                if not keep_going:
+                    break
+    except Exception as e:
+        failed += 1
+        traceback.print_exc()
+        write_result(results_f, {'step': 0, 'command': None, 'status': 'failed',
+                                 'error': f'{type(e).__name__}: {e}'})
+    finally:
+        summary = {'steps': steps,
+                   'failed': failed,
+                   'duration': time.perf_counter() - started,
+                   'unsaved_change_log': None}
+        if interface is not None:
+            interpreter = interface.interpreter
+            summary['unsaved_change_log'] = not interpreter.change_log.saved
+            interpreter.save_cache()
+            interpreter.close_project_state()
+            summary['pool'] = interpreter.db_driver.format_pool_stats()
+            interpreter.db_driver.close_conn()
+        write_result(results_f, {'summary': summary})
+
+    return failed == 0
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(prog='iliq',
+                                     description='Runs iliq commands without prompts, '
+                                                 'printing one JSON result per command to stdout')
+    parser.add_argument('--env', default=None, help='.env file with ILIQ_* settings')
+    parser.add_argument('--script', default=None,
+                        help='file with one command per line, - reads commands from stdin')
+    parser.add_argument('--keep-going', action='store_true',
+                        help='run remaining commands after a failed one')
+    parser.add_argument('command', nargs=argparse.REMAINDER,
+                        help='command and its arguments, e.g. update --contexts ddl')
+    args = parser.parse_args(argv)
+
+    if not args.script and not args.command:
+        parser.error('either a command or --script is required')
+
+    if args.env:
+        from dotenv import load_dotenv
+
+        load_dotenv(dotenv_path=args.env)
+
+    if args.script == '-':
+        commands = iter_script_commands(sys.stdin)
+    elif args.script:
+        with open(args.script) as f:
+            commands = list(iter_script_commands(f))
+    else:
+        commands = [args.command]
+
+    # command output (including Liquibase subprocesses) goes to stderr, results own stdout
+    sys.stdout.flush()
+    results_f = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+    sys.stdin = open(os.devnull)
+
+    ok = run_script(commands, args.keep_going, results_f)
+    results_f.close()
+
+    sys.exit(0 if ok else 1)
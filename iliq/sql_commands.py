@@ -11,7 +11,7 @@ class PostgreSQLCommands(Enum):
     where s.nspname not in ('information_schema', 'pg_catalog')
           and s.nspname not like 'pg_toast%%'
           and s.nspname not like 'pg_temp_%%'
-          and s.nspname = coalesce( %s, s.nspname )
+          and s.nspname = coalesce( %(schema_name)s, s.nspname )
     '''
 
     views_routines_triggers_select = '''
@@ -33,6 +33,10 @@ class PostgreSQLCommands(Enum):
                                          join pg_catalog.pg_namespace s
                                               on t.relnamespace = s.oid
                                 where t.relkind in ('v', 'm')
+                                  and s.nspname not in ('information_schema', 'pg_catalog')
+                                  and s.nspname not like 'pg_toast%%'
+                                  and s.nspname not like 'pg_temp_%%'
+                                  and s.nspname = coalesce( %(schema_name)s, s.nspname )
     
                                 union all
     
@@ -41,16 +45,30 @@ class PostgreSQLCommands(Enum):
                                        case
                                            when t.prokind = 'f' then 'function'
                                            when t.prokind = 'p' then 'procedure' end,
-                                       case when count(*) over (partition by t.proname) > 1 then
-                                            t.proname ||'_'||row_number() over (partition by t.proname order by t.oid asc)
+                                       case when o.overloads > 1 then
+                                            t.proname ||'_'||o.overload_number
                                             else
                                             t.proname
                                        end as object_name,
                                        pg_get_functiondef(t.oid)
-                                from pg_catalog.pg_proc t
+                                from (select p.oid,
+                                             count(*) over (partition by p.proname) as overloads,
+                                             row_number() over (partition by p.proname order by p.oid asc) as overload_number
+                                        from pg_catalog.pg_proc p
+                                       where p.prokind not in ('a', 'w')
+                                         and p.proname in (select sp.proname
+                                                             from pg_catalog.pg_proc sp
+                                                             join pg_catalog.pg_namespace sn
+                                                               on sp.pronamespace = sn.oid
+                                                            where sn.nspname = coalesce( %(schema_name)s, sn.nspname ))) o
+                                         join pg_catalog.pg_proc t
+                                              on t.oid = o.oid
                                          join pg_catalog.pg_namespace s
                                               on t.pronamespace = s.oid
-                                where t.prokind not in ('a', 'w')
+                                where s.nspname not in ('information_schema', 'pg_catalog')
+                                  and s.nspname not like 'pg_toast%%'
+                                  and s.nspname not like 'pg_temp_%%'
+                                  and s.nspname = coalesce( %(schema_name)s, s.nspname )
     
                                 union all
     
@@ -66,38 +84,51 @@ class PostgreSQLCommands(Enum):
                                     join pg_catalog.pg_namespace s
                                     on c.relnamespace = s.oid
                                     where not tr.tgisinternal
+                                      and s.nspname not in ('information_schema', 'pg_catalog')
+                                      and s.nspname not like 'pg_toast%%'
+                                      and s.nspname not like 'pg_temp_%%'
+                                      and s.nspname = coalesce( %(schema_name)s, s.nspname )
                                 )
     
     select *
     from objects_as_created t
-    where t.schema_name not in ('information_schema', 'pg_catalog')
-      and t.schema_name not like 'pg_toast%%'
-      and t.schema_name not like 'pg_temp_%%'
-      and t.schema_name = coalesce( %s, t.schema_name )
-    order by t.oid;
+    order by t.oid
     '''
 
     routines_text_select = '''
     SELECT s.nspname as schema_name, 
-           case when count(*) over (partition by f.proname) > 1 then
-               f.proname ||'_'||row_number() over (partition by f.proname order by f.oid asc)
+           case when o.overloads > 1 then
+               f.proname ||'_'||o.overload_number
                else
                f.proname
            end as object_name, 
            case when f.prokind = 'f' then 'function'
                 when f.prokind = 'p' then 'procedure' end as object_type,
-           pg_get_functiondef(f.oid) object_text
-      FROM pg_catalog.pg_proc f
+           pg_get_functiondef(f.oid) object_text,
+           f.oid
+      FROM (SELECT p.oid,
+                   count(*) over (partition by p.proname) as overloads,
+                   row_number() over (partition by p.proname order by p.oid asc) as overload_number
+              FROM pg_catalog.pg_proc p
+             WHERE p.prokind not in ('a', 'w')
+                   and p.pronamespace in (select n.oid
+                                            from pg_catalog.pg_namespace n
+                                            join pg_catalog.pg_user u
+                                              on u.usesysid = n.nspowner
+                                           where n.nspname not in ('information_schema', 'pg_catalog')
+                                                 and n.nspname not like 'pg_toast%%'
+                                                 and n.nspname not like 'pg_temp_%%')
+                   and p.proname in (select sp.proname
+                                       from pg_catalog.pg_proc sp
+                                       join pg_catalog.pg_namespace sn
+                                         on sp.pronamespace = sn.oid
+                                      where sn.nspname = coalesce( %(schema_name)s, sn.nspname ))) o
+      JOIN pg_catalog.pg_proc f
+        ON f.oid = o.oid
       JOIN pg_catalog.pg_namespace s 
         ON f.pronamespace = s.oid
-      join pg_catalog.pg_user u 
-        on u.usesysid = s.nspowner
      
-     WHERE f.prokind not in ('a', 'w')
-           and s.nspname not in ('information_schema', 'pg_catalog')
-           and s.nspname not like 'pg_toast%%'
-           and s.nspname not like 'pg_temp_%%'
-           and s.nspname = coalesce( %s, s.nspname )
+     WHERE s.nspname = coalesce( %(schema_name)s, s.nspname )
     order by f.oid asc 
     '''
 
@@ -105,7 +136,8 @@ class PostgreSQLCommands(Enum):
     select s.nspname as schema_name,
            tr.tgname as object_name,
            'trigger' as object_type,
-           pg_get_triggerdef(tr.oid) object_text
+           pg_get_triggerdef(tr.oid) object_text,
+           tr.oid
        
       from pg_catalog.pg_trigger tr
       join pg_catalog.pg_class c
@@ -113,7 +145,7 @@ class PostgreSQLCommands(Enum):
       join pg_catalog.pg_namespace s
         on c.relnamespace = s.oid
      where not tr.tgisinternal
-           and s.nspname = coalesce( %s, s.nspname )
+           and s.nspname = coalesce( %(schema_name)s, s.nspname )
      order by tr.oid asc
     '''
 
@@ -123,12 +155,16 @@ class PostgreSQLCommands(Enum):
            'materialized_view' as object_type,
            format(E'create materialized view %%s as \n %%s',
                   t.matviewname,
-                  pg_get_viewdef(c.oid, true)) as object_text
+                  pg_get_viewdef(c.oid, true)) as object_text,
+           c.oid
     
       from pg_catalog.pg_matviews t
       join pg_catalog.pg_class c
         on t.matviewname = c.relname
-     where t.schemaname = coalesce( %s, t.schemaname )
+      join pg_catalog.pg_namespace n
+        on c.relnamespace = n.oid
+       and t.schemaname = n.nspname
+     where t.schemaname = coalesce( %(schema_name)s, t.schemaname )
      order by c.oid asc
     '''
 
@@ -149,7 +185,7 @@ class PostgreSQLCommands(Enum):
                      AND el.oid is null
                      AND n.nspname not in ('pg_catalog', 'information_schema')
                      AND n.nspname !~ '^pg_toast'
-                     AND n.nspname = coalesce(%s, n.nspname)
+                     AND n.nspname = coalesce(%(schema_name)s, n.nspname)
     ),
          cols AS (SELECT types.oid,
                          n.nspname                             AS schema_name,
@@ -177,7 +213,8 @@ class PostgreSQLCommands(Enum):
                   string_agg(
                           format('%%s %%s',
                                  cols.column_name,
-                                 cols.data_type)::text, E',\n'::text order by cols.ordinal_position)) as object_text
+                                 cols.data_type)::text, E',\n'::text order by cols.ordinal_position)) as object_text,
+           cols.oid
     FROM cols
     group by cols.schema_name,
              cols.obj_name,
@@ -185,10 +222,223 @@ class PostgreSQLCommands(Enum):
     order by cols.oid asc
     '''
 
+    sequences_ddl_select = '''
+    select n.nspname as schema_name,
+           c.relname as object_name,
+           'sequence' as object_type,
+           format(E'CREATE SEQUENCE %%I.%%I AS %%s\nINCREMENT BY %%s MINVALUE %%s MAXVALUE %%s START WITH %%s CACHE %%s%%s;',
+                  n.nspname,
+                  c.relname,
+                  format_type(s.seqtypid, null),
+                  s.seqincrement,
+                  s.seqmin,
+                  s.seqmax,
+                  s.seqstart,
+                  s.seqcache,
+                  case when s.seqcycle then ' CYCLE' else ' NO CYCLE' end) as object_text,
+           c.oid
+      from pg_catalog.pg_sequence s
+      join pg_catalog.pg_class c
+        on c.oid = s.seqrelid
+      join pg_catalog.pg_namespace n
+        on n.oid = c.relnamespace
+     where not exists (select 1
+                         from pg_catalog.pg_depend d
+                        where d.classid = 'pg_catalog.pg_class'::regclass
+                          and d.objid = c.oid
+                          and d.deptype = 'i')
+           and n.nspname not in ('information_schema', 'pg_catalog')
+           and n.nspname not like 'pg_toast%%'
+           and n.nspname not like 'pg_temp_%%'
+           and n.nspname = coalesce( %(schema_name)s, n.nspname )
+     order by c.oid
+    '''
+
+    tables_ddl_select = '''
+    select n.nspname as schema_name,
+           c.relname as object_name,
+           'table' as object_type,
+           format(E'CREATE %%sTABLE %%I.%%I (\n%%s\n)%%s;',
+                  case when c.relpersistence = 'u' then 'UNLOGGED ' else '' end,
+                  n.nspname,
+                  c.relname,
+                  coalesce(string_agg(format('    %%I %%s%%s%%s',
+                                             a.attname,
+                                             format_type(a.atttypid, a.atttypmod),
+                                             case
+                                                 when a.attidentity = 'a' then ' GENERATED ALWAYS AS IDENTITY'
+                                                 when a.attidentity = 'd' then ' GENERATED BY DEFAULT AS IDENTITY'
+                                                 when a.attgenerated = 's' then
+                                                     ' GENERATED ALWAYS AS (' || pg_get_expr(d.adbin, d.adrelid) || ') STORED'
+                                                 when d.adbin is not null then
+                                                     ' DEFAULT ' || pg_get_expr(d.adbin, d.adrelid)
+                                                 else '' end,
+                                             case when a.attnotnull then ' NOT NULL' else '' end),
+                                      E',\n' order by a.attnum) filter (where a.attnum is not null), ''),
+                  case when c.relkind = 'p' then ' PARTITION BY ' || pg_get_partkeydef(c.oid) else '' end) as object_text,
+           c.oid
+      from pg_catalog.pg_class c
+      join pg_catalog.pg_namespace n
+        on n.oid = c.relnamespace
+      left join pg_catalog.pg_attribute a
+        on a.attrelid = c.oid
+       and a.attnum > 0
+       and not a.attisdropped
+      left join pg_catalog.pg_attrdef d
+        on d.adrelid = a.attrelid
+       and d.adnum = a.attnum
+     where c.relkind in ('r', 'p')
+           and not c.relispartition
+           and n.nspname not in ('information_schema', 'pg_catalog')
+           and n.nspname not like 'pg_toast%%'
+           and n.nspname not like 'pg_temp_%%'
+           and n.nspname = coalesce( %(schema_name)s, n.nspname )
+     group by n.nspname, c.relname, c.oid, c.relpersistence, c.relkind
+     order by c.oid
+    '''
+
+    indexes_ddl_select = '''
+    select n.nspname as schema_name,
+           c.relname as object_name,
+           'index' as object_type,
+           pg_get_indexdef(i.indexrelid) || ';' as object_text,
+           i.indexrelid as oid
+      from pg_catalog.pg_index i
+      join pg_catalog.pg_class c
+        on c.oid = i.indrelid
+      join pg_catalog.pg_namespace n
+        on n.oid = c.relnamespace
+     where c.relkind in ('r', 'p')
+           and not c.relispartition
+           and not exists (select 1
+                             from pg_catalog.pg_constraint k
+                            where k.conindid = i.indexrelid
+                              and k.contype in ('p', 'u', 'x'))
+           and n.nspname not in ('information_schema', 'pg_catalog')
+           and n.nspname not like 'pg_toast%%'
+           and n.nspname not like 'pg_temp_%%'
+           and n.nspname = coalesce( %(schema_name)s, n.nspname )
+     order by i.indexrelid
+    '''
+
+    constraints_ddl_select = '''
+    select n.nspname as schema_name,
+           c.relname as object_name,
+           'constraint' as object_type,
+           format('ALTER TABLE %%I.%%I ADD CONSTRAINT %%I %%s;',
+                  n.nspname,
+                  c.relname,
+                  k.conname,
+                  pg_get_constraintdef(k.oid)) as object_text,
+           k.contype = 'f' as is_foreign_key,
+           k.oid
+      from pg_catalog.pg_constraint k
+      join pg_catalog.pg_class c
+        on c.oid = k.conrelid
+      join pg_catalog.pg_namespace n
+        on n.oid = c.relnamespace
+     where k.contype in ('p', 'u', 'x', 'c', 'f')
+           and k.conislocal
+           and c.relkind in ('r', 'p')
+           and not c.relispartition
+           and n.nspname not in ('information_schema', 'pg_catalog')
+           and n.nspname not like 'pg_toast%%'
+           and n.nspname not like 'pg_temp_%%'
+           and n.nspname = coalesce( %(schema_name)s, n.nspname )
+     order by case when k.contype = 'f' then 1 else 0 end, k.oid
+    '''
+
+    catalog_fingerprint_select = '''
+    select t.oid as object_key,
+           t.schema_name,
+           t.object_name,
+           t.object_type,
+           md5(t.object_text) as fingerprint
+      from ({catalog_select}) t
+    '''
+
+    catalog_by_keys_select = '''
+    with objects_by_keys as (select s.nspname                           as schema_name,
+                                    t.oid,
+                                    case
+                                        when t.relkind = 'v' then
+                                            'view'
+                                        else 'materialized_view' end    as object_type,
+                                    t.relname                           as object_name,
+                                    format(case
+                                               when t.relkind = 'v' then
+                                                   E'create or replace view %%s.%%s as \n %%s'
+                                               else E'create materialized view %%s.%%s as \n %%s' end,
+                                           s.nspname,
+                                           t.relname,
+                                           pg_get_viewdef(t.oid, true)) as object_text
+                             from pg_catalog.pg_class t
+                                      join pg_catalog.pg_namespace s
+                                           on t.relnamespace = s.oid
+                             where t.oid = any(%(object_keys)s::oid[])
+                               and t.relkind in ('v', 'm')
+
+                             union all
+
+                             select s.nspname,
+                                    t.oid,
+                                    case
+                                        when t.prokind = 'f' then 'function'
+                                        when t.prokind = 'p' then 'procedure' end,
+                                    case when o.overloads > 1 then
+                                         t.proname ||'_'||o.overload_number
+                                         else
+                                         t.proname
+                                    end as object_name,
+                                    pg_get_functiondef(t.oid)
+                             from (select p.oid,
+                                          count(*) over (partition by p.proname) as overloads,
+                                          row_number() over (partition by p.proname order by p.oid asc) as overload_number
+                                     from pg_catalog.pg_proc p
+                                    where p.prokind not in ('a', 'w')
+                                      and p.proname in (select sp.proname
+                                                          from pg_catalog.pg_proc sp
+                                                         where sp.oid = any(%(object_keys)s::oid[]))) o
+                                      join pg_catalog.pg_proc t
+                                           on t.oid = o.oid
+                                      join pg_catalog.pg_namespace s
+                                           on t.pronamespace = s.oid
+                             where t.oid = any(%(object_keys)s::oid[])
+
+                             union all
+
+                             select s.nspname,
+                                    tr.oid,
+                                    'trigger',
+                                    tr.tgname,
+                                    pg_get_triggerdef(tr.oid)
+
+                                 from pg_catalog.pg_trigger tr
+                                 join pg_catalog.pg_class c
+                                 on tr.tgrelid = c.oid
+                                 join pg_catalog.pg_namespace s
+                                 on c.relnamespace = s.oid
+                                 where tr.oid = any(%(object_keys)s::oid[])
+                                   and not tr.tgisinternal
+                             )
+
+    select *
+    from objects_by_keys t
+    order by t.oid
+    '''
+
     databasechangelog_delete = '''
     delete from {schema_name}.databasechangelog where id = coalesce(%s, id)
     '''
 
+    databasechangelog_keys_select = '''
+    select id, author, filename from {table_name}
+    '''
+
+    databasechangelog_state_select = '''
+    select id, author, filename, md5sum from {table_name}
+    '''
+
 
 class OracleSQLCommands(Enum):
     schema_list_select = '''
@@ -239,8 +489,13 @@ class OracleSQLCommands(Enum):
     SELECT
         t.schema_name,
         t.object_name,
-        t.object_type, 
-        DBMS_METADATA.GET_DDL(t.object_type, t.object_name, t.schema_name) as object_text
+        CASE t.object_type
+            WHEN 'MATERIALIZED VIEW' THEN 'materialized_view'
+            WHEN 'TYPE'              THEN 'composite_type'
+            ELSE lower(t.object_type)
+        END AS object_type,
+        DBMS_METADATA.GET_DDL(DECODE(t.object_type, 'MATERIALIZED VIEW', 'MATERIALIZED_VIEW', t.object_type), t.object_name, t.schema_name) as object_text,
+        t.object_id
     FROM
         object_list t
     where t.schema_name = coalesce(:schema_name, t.schema_name)
@@ -281,8 +536,13 @@ class OracleSQLCommands(Enum):
     SELECT
         t.schema_name,
         t.object_name,
-        t.object_type, 
-        DBMS_METADATA.GET_DDL(t.object_type, t.object_name, t.schema_name) as object_text
+        CASE t.object_type
+            WHEN 'MATERIALIZED VIEW' THEN 'materialized_view'
+            WHEN 'TYPE'              THEN 'composite_type'
+            ELSE lower(t.object_type)
+        END AS object_type,
+        DBMS_METADATA.GET_DDL(DECODE(t.object_type, 'MATERIALIZED VIEW', 'MATERIALIZED_VIEW', t.object_type), t.object_name, t.schema_name) as object_text,
+        t.object_id
     FROM
         object_list t
     where t.schema_name = coalesce(:schema_name, t.schema_name)
@@ -315,8 +575,13 @@ class OracleSQLCommands(Enum):
     SELECT
         t.schema_name,
         t.object_name,
-        t.object_type, 
-        DBMS_METADATA.GET_DDL(t.object_type, t.object_name, t.schema_name) as object_text
+        CASE t.object_type
+            WHEN 'MATERIALIZED VIEW' THEN 'materialized_view'
+            WHEN 'TYPE'              THEN 'composite_type'
+            ELSE lower(t.object_type)
+        END AS object_type,
+        DBMS_METADATA.GET_DDL(DECODE(t.object_type, 'MATERIALIZED VIEW', 'MATERIALIZED_VIEW', t.object_type), t.object_name, t.schema_name) as object_text,
+        t.object_id
     FROM
         object_list t
     where t.schema_name = coalesce(:schema_name, t.schema_name)
@@ -348,13 +613,18 @@ class OracleSQLCommands(Enum):
     SELECT
         t.schema_name,
         t.object_name,
-        t.object_type, 
-        DBMS_METADATA.GET_DDL(t.object_type, t.object_name, t.schema_name) as object_text
+        CASE t.object_type
+            WHEN 'MATERIALIZED VIEW' THEN 'materialized_view'
+            WHEN 'TYPE'              THEN 'composite_type'
+            ELSE lower(t.object_type)
+        END AS object_type,
+        DBMS_METADATA.GET_DDL(DECODE(t.object_type, 'MATERIALIZED VIEW', 'MATERIALIZED_VIEW', t.object_type), t.object_name, t.schema_name) as object_text,
+        t.object_id
     FROM
         object_list t
     where t.schema_name = coalesce(:schema_name, t.schema_name)
     ORDER BY
-        t.ot_order
+        t.object_id
     '''
 
     object_types_select = '''
@@ -381,8 +651,13 @@ class OracleSQLCommands(Enum):
     SELECT
         t.schema_name,
         t.object_name,
-        t.object_type, 
-        DBMS_METADATA.GET_DDL(t.object_type, t.object_name, t.schema_name) as object_text
+        CASE t.object_type
+            WHEN 'MATERIALIZED VIEW' THEN 'materialized_view'
+            WHEN 'TYPE'              THEN 'composite_type'
+            ELSE lower(t.object_type)
+        END AS object_type,
+        DBMS_METADATA.GET_DDL(DECODE(t.object_type, 'MATERIALIZED VIEW', 'MATERIALIZED_VIEW', t.object_type), t.object_name, t.schema_name) as object_text,
+        t.object_id
     FROM
         object_list t
     where t.schema_name = coalesce(:schema_name, t.schema_name)
@@ -390,6 +665,172 @@ class OracleSQLCommands(Enum):
         t.object_id
     '''
 
+    sequences_ddl_select = '''
+    SELECT
+        t.sequence_owner AS schema_name,
+        t.sequence_name AS object_name,
+        'sequence' AS object_type,
+        DBMS_METADATA.GET_DDL('SEQUENCE', t.sequence_name, t.sequence_owner) AS object_text,
+        o.created,
+        o.object_id
+    FROM
+        all_sequences t
+        JOIN all_objects o
+            ON o.owner = t.sequence_owner
+            AND o.object_name = t.sequence_name
+            AND o.object_type = 'SEQUENCE'
+    WHERE
+        t.sequence_owner IN (
+            SELECT
+                u.username
+            FROM
+                all_users u
+            WHERE
+                u.oracle_maintained = 'N'
+        )
+        AND t.sequence_name NOT LIKE 'ISEQ$$%'
+        AND t.sequence_owner = coalesce(:schema_name, t.sequence_owner)
+    ORDER BY
+        o.created,
+        o.object_id
+    '''
+
+    tables_ddl_select = '''
+    SELECT
+        t.owner AS schema_name,
+        t.table_name AS object_name,
+        'table' AS object_type,
+        DBMS_METADATA.GET_DDL('TABLE', t.table_name, t.owner) AS object_text,
+        o.created,
+        o.object_id
+    FROM
+        all_tables t
+        JOIN all_objects o
+            ON o.owner = t.owner
+            AND o.object_name = t.table_name
+            AND o.object_type = 'TABLE'
+    WHERE
+        t.owner IN (
+            SELECT
+                u.username
+            FROM
+                all_users u
+            WHERE
+                u.oracle_maintained = 'N'
+        )
+        AND t.nested = 'NO'
+        AND t.secondary = 'N'
+        AND (t.iot_type IS NULL OR t.iot_type = 'IOT')
+        AND t.owner = coalesce(:schema_name, t.owner)
+    ORDER BY
+        o.created,
+        o.object_id
+    '''
+
+    indexes_ddl_select = '''
+    SELECT
+        t.table_owner AS schema_name,
+        t.table_name AS object_name,
+        'index' AS object_type,
+        DBMS_METADATA.GET_DDL('INDEX', t.index_name, t.owner) AS object_text,
+        o.created,
+        o.object_id
+    FROM
+        all_indexes t
+        JOIN all_objects o
+            ON o.owner = t.owner
+            AND o.object_name = t.index_name
+            AND o.object_type = 'INDEX'
+    WHERE
+        t.table_owner IN (
+            SELECT
+                u.username
+            FROM
+                all_users u
+            WHERE
+                u.oracle_maintained = 'N'
+        )
+        AND t.generated = 'N'
+        AND t.index_type NOT IN ( 'LOB', 'IOT - TOP' )
+        AND NOT EXISTS (
+            SELECT
+                1
+            FROM
+                all_constraints c
+            WHERE
+                c.owner = t.table_owner
+                AND c.index_owner = t.owner
+                AND c.index_name = t.index_name
+        )
+        AND t.table_owner = coalesce(:schema_name, t.table_owner)
+    ORDER BY
+        o.created,
+        o.object_id
+    '''
+
+    catalog_fingerprint_select = '''
+    SELECT
+        t.object_id AS object_key,
+        t.owner AS schema_name,
+        t.object_name,
+        CASE t.object_type
+            WHEN 'MATERIALIZED VIEW' THEN 'materialized_view'
+            WHEN 'TYPE'              THEN 'composite_type'
+            ELSE lower(t.object_type)
+        END AS object_type,
+        to_char(t.last_ddl_time, 'YYYY-MM-DD HH24:MI:SS') AS fingerprint
+    FROM
+        all_objects t
+    WHERE
+        t.object_type IN ( 'PACKAGE', 'TYPE', 'TRIGGER',
+                           'PROCEDURE', 'FUNCTION', 'VIEW', 'MATERIALIZED VIEW' )
+        AND t.owner IN (
+            SELECT
+                t.username AS schema_name
+            FROM
+                all_users t
+            WHERE
+                t.oracle_maintained = 'N'
+        )
+        AND t.owner = coalesce(:schema_name, t.owner)
+    ORDER BY
+        t.object_id
+    '''
+
+    catalog_by_keys_select = '''
+    SELECT
+        t.owner AS schema_name,
+        t.object_name,
+        CASE t.object_type
+            WHEN 'MATERIALIZED VIEW' THEN 'materialized_view'
+            WHEN 'TYPE'              THEN 'composite_type'
+            ELSE lower(t.object_type)
+        END AS object_type,
+        DBMS_METADATA.GET_DDL(DECODE(t.object_type, 'MATERIALIZED VIEW', 'MATERIALIZED_VIEW', t.object_type), t.object_name, t.owner) as object_text
+    FROM
+        all_objects t
+    WHERE
+        t.object_id IN ( {object_keys} )
+    ORDER BY
+        t.object_id
+    '''
+
+    metadata_session_setup = '''
+    begin
+        dbms_metadata.set_transform_param(dbms_metadata.session_transform, 'SEGMENT_ATTRIBUTES', false);
+        dbms_metadata.set_transform_param(dbms_metadata.session_transform, 'STORAGE', false);
+        dbms_metadata.set_transform_param(dbms_metadata.session_transform, 'TABLESPACE', false);
+    end;
+    '''
+
     databasechangelog_delete = '''
     delete from {schema_name}.databasechangelog where id = coalesce(:id, id)
     '''
+
+    databasechangelog_keys_select = '''
+    select id, author, filename from {table_name}
+    '''
+
+    databasechangelog_state_select = '''
+    select id, author, filename, md5sum from {table_name}
+    '''
@@ -9,11 +9,13 @@ setup(
 
     install_requires=[
         'psycopg~=3.1.13; python_version == "3.10"',
+        'psycopg_pool~=3.2.0; python_version == "3.10"',
     ],
 
     entry_points={
         'console_scripts': [
             'iliq = iliq.liqui:cli_startup',
+            'iliq-fleet = iliq.fleet:main',
         ]
     }
 )
\ No newline at end of file
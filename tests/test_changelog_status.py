@@ -0,0 +1,28 @@
+from iliq.changelog_status import sql_file_checksum, change_set_checksum
+
+
+# md5sum values written to databasechangelog by Liquibase 4.6.2 (PostgreSQL) for the same files
+def test_sql_file_checksum_with_end_delimiter():
+    sql = b'create or replace view s1.v1 as\n  select 1 as one,\n\t2   as two\n/\n'
+    assert change_set_checksum([sql_file_checksum(sql, '\n/')]) == '8:15c022e39bf553f94e26776af38c1072'
+
+
+def test_sql_file_checksum_without_end_delimiter():
+    sql = b'-- hand written\ninsert into s1.t (id) values (1);\ninsert into s1.t (id) values (2);\n'
+    assert change_set_checksum([sql_file_checksum(sql)]) == '8:9b978b17622d93f0ca909af91bf7f9c2'
+
+
+def test_sql_file_checksum_whitespace():
+    sql = b'select 1;\r\n\r\n  select   2;\x0b\n'
+    assert change_set_checksum([sql_file_checksum(sql, ';')]) == '8:5e22347ca3528aaa89ac461bddede0e1'
+
+
+def test_sql_file_checksum_flags():
+    sql = b'-- c\nselect 3; /* x */\n'
+    assert change_set_checksum([sql_file_checksum(sql, None, False, True)]) == '8:b04be37ea28bcb55b591c5b9dc72fde6'
+
+
+def test_change_set_checksum_several_changes():
+    checksums = [sql_file_checksum(b'-- c\nselect 3; /* x */\n'),
+                 sql_file_checksum(b'select 1;\r\n\r\n  select   2;\x0b\n')]
+    assert change_set_checksum(checksums) == '8:0b1d40e527d67e30bdc6aae602ec3ba0'
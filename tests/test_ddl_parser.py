@@ -0,0 +1,97 @@
+import io
+
+from iliq.ddl_parser import parse_ddl_lines, parse_ddl_mmap
+
+
+# the line parser parse_ddl_lines replaced, kept to check the lexer against it where it was right
+def baseline_parse_ddl(lines, cmd_sep=';'):
+    def check_quotations(cmd):
+        cnt = 0
+        for c in cmd:
+            if c == '\'':
+                cnt = 1 - cnt
+        return not cnt
+
+    cmd = ''
+    for line in lines:
+        if not line.startswith('--'):
+            cmd += '\n' + line.strip()
+            if '\'' in cmd and not check_quotations(cmd):
+                continue
+
+        if cmd.endswith(cmd_sep):
+            yield cmd.replace('"', '')
+            cmd = ''
+
+
+def parse_both(tmp_path, sql, cmd_sep=';'):
+    sql_path = tmp_path / 'dump.sql'
+    sql_path.write_text(sql, encoding='utf-8')
+    by_lines = list(parse_ddl_lines(io.StringIO(sql), cmd_sep))
+    by_mmap = list(parse_ddl_mmap(str(sql_path), cmd_sep))
+    assert by_lines == by_mmap
+    return by_lines
+
+
+def test_quotes_match_baseline(tmp_path):
+    sql = ('-- liquibase formatted sql\n'
+           '\n'
+           '-- changeset gen:1-1\n'
+           'CREATE TABLE "s1"."t1" (id int, name varchar(10) DEFAULT \'a;b\');\n'
+           'COMMENT ON TABLE s1.t1 IS \'multi\n'
+           'line; it\'\'s here;\n'
+           '\';\n'
+           '   CREATE INDEX i1 ON s1.t1 (name);   \n'
+           'ALTER TABLE s1.t1 ADD CONSTRAINT c1 CHECK (name <> \'--\');\n')
+
+    cmds = parse_both(tmp_path, sql)
+
+    assert cmds == list(baseline_parse_ddl(io.StringIO(sql)))
+    assert cmds == ['\n\nCREATE TABLE s1.t1 (id int, name varchar(10) DEFAULT \'a;b\');',
+                    '\nCOMMENT ON TABLE s1.t1 IS \'multi\nline; it\'\'s here;\n\';',
+                    '\nCREATE INDEX i1 ON s1.t1 (name);',
+                    '\nALTER TABLE s1.t1 ADD CONSTRAINT c1 CHECK (name <> \'--\');']
+
+
+def test_custom_separator_matches_baseline(tmp_path):
+    sql = ('CREATE VIEW s1.v1 AS SELECT \'x\nGO\' AS a\nGO\n'
+           'CREATE VIEW s1.v2 AS SELECT 2 AS b\nGO\n')
+
+    cmds = parse_both(tmp_path, sql, 'GO')
+
+    assert cmds == list(baseline_parse_ddl(io.StringIO(sql), 'GO'))
+    assert cmds == ['\nCREATE VIEW s1.v1 AS SELECT \'x\nGO\' AS a\nGO',
+                    '\nCREATE VIEW s1.v2 AS SELECT 2 AS b\nGO']
+
+
+def test_dollar_quoted_bodies(tmp_path):
+    sql = ('CREATE FUNCTION s1.f() RETURNS int AS $$\n'
+           'begin\n'
+           '  return 1;\n'
+           'end;\n'
+           '$$ LANGUAGE plpgsql;\n'
+           'CREATE FUNCTION s1.g() RETURNS text AS $body$ select \';\' $x$;\n'
+           '$body$ LANGUAGE sql;\n'
+           'CREATE VIEW s1.v AS SELECT price$ FROM s1.t;\n')
+
+    assert parse_both(tmp_path, sql) == [
+        '\nCREATE FUNCTION s1.f() RETURNS int AS $$\nbegin\nreturn 1;\nend;\n$$ LANGUAGE plpgsql;',
+        '\nCREATE FUNCTION s1.g() RETURNS text AS $body$ select \';\' $x$;\n$body$ LANGUAGE sql;',
+        '\nCREATE VIEW s1.v AS SELECT price$ FROM s1.t;']
+
+
+def test_comments(tmp_path):
+    sql = ('-- header;\n'
+           'CREATE FUNCTION s1.f() RETURNS int AS $$\n'
+           '-- not a statement end;\n'
+           'select 1\n'
+           '$$ LANGUAGE sql;\n'
+           '/* block; /* nested; */ still;\n'
+           '*/ CREATE VIEW s1.v AS SELECT 1;\n'
+           'CREATE INDEX i1 ON s1.t1 (name); -- trailing;\n'
+           'CREATE SEQUENCE s1.q;\n')
+
+    assert parse_both(tmp_path, sql) == [
+        '\nCREATE FUNCTION s1.f() RETURNS int AS $$\n-- not a statement end;\nselect 1\n$$ LANGUAGE sql;',
+        '\n/* block; /* nested; */ still;\n*/ CREATE VIEW s1.v AS SELECT 1;',
+        '\nCREATE INDEX i1 ON s1.t1 (name); -- trailing;\nCREATE SEQUENCE s1.q;']
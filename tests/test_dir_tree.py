@@ -0,0 +1,130 @@
+import os
+
+import pytest
+
+from iliq.dir_tree import DirTree, DDLTypesMap, DDLObjectWriter
+
+
+class FakeDriver:
+    rdbms_type = 'postgresql'
+    db_name = 'test'
+
+    def get_all_schemas(self):
+        return ['s1']
+
+
+def test_put_records_into_tree_same_path_last_record_wins(tmp_path):
+    dir_tree = DirTree(FakeDriver(), str(tmp_path / 'project'), writer_threads=8, queue_depth=64, lazy_dirs=True)
+    dir_tree.create_dir_tree()
+    texts = [f'-- trigger {i}\n' + ('x' * 200_000 if i % 2 else 'short\n') for i in range(400)]
+    records = ({'schema_name': 's1',
+                'object_name': 'set_updated_at',
+                'object_type': 'trigger',
+                'object_text': text} for text in texts)
+
+    object_recs = list(dir_tree.put_records_into_tree(records))
+
+    assert len(object_recs) == 400
+    with open(os.path.join(tmp_path, 'project', 's1', 'triggers', 'set_updated_at.sql'), encoding='utf-8') as f:
+        assert f.read() == texts[-1]
+
+
+@pytest.mark.parametrize('ddl_cmd, o_name, o_type', [
+    ('\nCREATE TABLE s1.t1 (id int);', 's1.t1', DDLTypesMap.table),
+    ('\ncreate table if not exists s1.t1 (id int);', 's1.t1', DDLTypesMap.table),
+    ('\nCREATE UNLOGGED TABLE s1.t2 (id int);', 's1.t2', DDLTypesMap.table),
+    ('\nCREATE TABLE "my schema"."my table" (id int);', '"my schema"."my table"', DDLTypesMap.table),
+    ('\nCREATE TABLE s1.t3' + ' ' * 600 + '(id int);', 's1.t3', DDLTypesMap.table),
+    ('\nCREATE VIEW s1.v1 AS SELECT 1;', 's1.v1', DDLTypesMap.view),
+    ('\nCREATE OR REPLACE VIEW s1.v1 AS SELECT 1;', 's1.v1', DDLTypesMap.view),
+    ('\nCREATE OR ALTER PROCEDURE s1.p1 AS', 's1.p1', DDLTypesMap.procedure),
+    ('\nCREATE OR REPLACE FUNCTION s1.f1() RETURNS int', 's1.f1()', DDLTypesMap.function),
+    ('\nCREATE OR REPLACE PACKAGE s1.pk AS', 's1.pk', DDLTypesMap.package),
+    ('\nCREATE SEQUENCE s1.q1;', 's1.q1;', DDLTypesMap.sequence),
+    ('\nCREATE SEQUENCE IF NOT EXISTS s1.q1;', 's1.q1;', DDLTypesMap.sequence),
+    ('\nCREATE INDEX i1 ON s1.t1 (id);', 'i1', DDLTypesMap.index),
+    ('\nALTER TABLE s1.t1 ADD CONSTRAINT t1_pk PRIMARY KEY (id);', 't1_pk', DDLTypesMap.constraint),
+    ('\nALTER TABLE ONLY s1.t1 ADD CONSTRAINT t1_pk PRIMARY KEY (id);', 't1_pk', DDLTypesMap.constraint),
+    ("\nCOMMENT ON TABLE s1.t1 IS 'x';", 's1.t1', DDLTypesMap.table_comment),
+    ("\nCOMMENT ON COLUMN s1.t1.id IS 'x';", 's1.t1.id', DDLTypesMap.column_comment),
+    ("\nCOMMENT ON VIEW s1.v1 IS 'x';", 's1.v1', DDLTypesMap.view_comment),
+])
+def test_classify_ddl(ddl_cmd, o_name, o_type):
+    assert DirTree.classify_ddl(ddl_cmd) == (o_name, o_type)
+
+
+@pytest.mark.parametrize('ddl_cmd, message', [
+    ('\nDROP TABLE s1.t1;', 'Wrong beginning'),
+    ('\nCREATE TRIGGER tr1 ON s1.t1;', 'Unknown DDL command'),
+    ('\nCREATE ' + 'x ' * 20 + 'TABLE s1.t1;', 'Unknown DDL command'),
+])
+def test_classify_ddl_rejects(ddl_cmd, message):
+    with pytest.raises(ValueError, match=message):
+        DirTree.classify_ddl(ddl_cmd)
+
+
+def write_tables(writer, tables, secondary):
+    for name in tables:
+        writer.put(DDLTypesMap.table, 's1', name, f'create table s1.{name} (id int);')
+    for o_type, name, ddl_cmd in secondary:
+        writer.put(o_type, 's1', name, ddl_cmd)
+    writer.flush()
+
+
+def read_tables(parent_dir, tables):
+    contents = {}
+    for name in tables:
+        with open(os.path.join(parent_dir, 's1', 'tables', f'{name}.sql'), encoding='utf-8') as f:
+            contents[name] = f.read()
+    return contents
+
+
+def test_object_writer_buffers_secondary_ddl_until_flush(tmp_path):
+    writer = DDLObjectWriter(str(tmp_path), lazy_dirs=True)
+    writer.put(DDLTypesMap.table, 's1', 't1', 'create table s1.t1 (id int);')
+    writer.put(DDLTypesMap.index, 's1', 't1', 'create index i1 on s1.t1 (id);')
+    writer.put(DDLTypesMap.constraint, 's1', 't1', 'alter table s1.t1 add constraint c1 unique (id);')
+    writer.put(DDLTypesMap.table_comment, 's1', 'missing', "comment on table s1.missing is 'x';")
+
+    t1_path = os.path.join(tmp_path, 's1', 'tables', 't1.sql')
+    with open(t1_path, encoding='utf-8') as f:
+        assert f.read() == 'create table s1.t1 (id int);'
+
+    writer.flush()
+
+    assert writer.buffered == 0
+    with open(t1_path, encoding='utf-8') as f:
+        assert f.read() == ('create table s1.t1 (id int);'
+                            '\ncreate index i1 on s1.t1 (id);'
+                            '\nalter table s1.t1 add constraint c1 unique (id);')
+    assert os.listdir(os.path.join(tmp_path, 's1', 'tables')) == ['t1.sql']
+
+
+def test_object_writer_spills_largest_files_first_and_keeps_order(tmp_path):
+    tables = ['t1', 't2', 't3']
+    secondary = []
+    for i in range(20):
+        secondary.append((DDLTypesMap.index, 't1', f'create index i{i} on s1.t1 (id);' + ' ' * 50))
+        secondary.append((DDLTypesMap.index, 't2', f'create index j{i} on s1.t2 (id);'))
+        if i % 5 == 0:
+            secondary.append((DDLTypesMap.constraint, 't3', f'alter table s1.t3 add constraint c{i} check (true);'))
+
+    write_tables(DDLObjectWriter(str(tmp_path / 'buffered'), lazy_dirs=True), tables, secondary)
+    expected = read_tables(tmp_path / 'buffered', tables)
+
+    spilled = []
+    writer = DDLObjectWriter(str(tmp_path / 'spilled'), buffer_size=1000, lazy_dirs=True)
+    flush_file = writer.flush_file
+    writer.flush_file = lambda o_file_path: spilled.append(os.path.basename(o_file_path)) or flush_file(o_file_path)
+    for name in tables:
+        writer.put(DDLTypesMap.table, 's1', name, f'create table s1.{name} (id int);')
+    for o_type, name, ddl_cmd in secondary:
+        writer.put(o_type, 's1', name, ddl_cmd)
+        assert writer.buffered <= 1000 + len(ddl_cmd)
+    spilled_before_flush = list(spilled)
+    writer.flush()
+
+    assert spilled_before_flush and spilled_before_flush[0] == 't1.sql'
+    assert read_tables(tmp_path / 'spilled', tables) == expected
+    assert expected['t1'].count('create index i') == 20
+    assert expected['t3'].endswith('add constraint c15 check (true);')
@@ -0,0 +1,89 @@
+from contextlib import contextmanager
+
+from iliq.liqui import LiqInterpreter, parse_changelog_insert, split_sql_values, changelog_row_key
+
+
+_INSERT = ("INSERT INTO public.databasechangelog (ID, AUTHOR, FILENAME, DATEEXECUTED, ORDEREXECUTED, MD5SUM) "
+           "VALUES ('1', 'me', 'f.json', NOW(), 1, '8:ab');")
+
+
+class FakeBatch:
+    conn = None
+
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, sql, *params):
+        self.executed.append((sql, params))
+
+
+class FakeDriver:
+    batch_stats = {'batches': 0}
+
+    def __init__(self):
+        self.current_batch = FakeBatch()
+
+    @contextmanager
+    def batch(self, commit_batches=True):
+        yield self.current_batch
+
+    def get_change_log_keys(self, table, conn):
+        return set()
+
+    def insert_sql(self, table, columns, shape):
+        return f'insert into {table} ({columns})'
+
+
+def test_upload_sql_changelog_dedupes_only_changelog_rows():
+    statements = ['UPDATE public.databasechangeloglock SET LOCKED = TRUE;',
+                  _INSERT,
+                  'INSERT INTO public.databasechangelog SELECT 1;',
+                  _INSERT,
+                  'INSERT INTO public.databasechangelog SELECT 1;',
+                  'UPDATE public.databasechangeloglock SET LOCKED = FALSE;']
+    liq = LiqInterpreter.__new__(LiqInterpreter)
+    liq.db_driver = FakeDriver()
+    liq.get_update_sql_changelog_dml = lambda contexts=None: iter(statements)
+
+    liq.upload_sql_changelog()
+
+    assert [sql for sql, _ in liq.db_driver.current_batch.executed] == [
+        'UPDATE public.databasechangeloglock SET LOCKED = TRUE',
+        'insert into public.databasechangelog (ID, AUTHOR, FILENAME, DATEEXECUTED, ORDEREXECUTED, MD5SUM)',
+        'INSERT INTO public.databasechangelog SELECT 1',
+        'INSERT INTO public.databasechangelog SELECT 1',
+        'UPDATE public.databasechangeloglock SET LOCKED = FALSE']
+
+
+def test_split_sql_values():
+    assert split_sql_values("'a, b', NOW(), coalesce(x, 'y'), 'it''s', NULL, 12") == [
+        "'a, b'", 'NOW()', "coalesce(x, 'y')", "'it''s'", 'NULL', '12']
+    assert split_sql_values("'(', ')'") == ["'('", "')'"]
+
+
+def test_parse_changelog_insert():
+    cmd = ("INSERT INTO public.databasechangelog (ID, AUTHOR, FILENAME, DATEEXECUTED, ORDEREXECUTED, MD5SUM, "
+           "DESCRIPTION, CONTEXTS) VALUES ('1700000000-1', 'o''brien', 'db/changelog.xml', NOW(), 12, '8:9a1b', "
+           "'sql, (x)', NULL);")
+
+    table, columns, shape, params = parse_changelog_insert(cmd)
+
+    assert table == 'public.databasechangelog'
+    assert columns == 'ID, AUTHOR, FILENAME, DATEEXECUTED, ORDEREXECUTED, MD5SUM, DESCRIPTION, CONTEXTS'
+    assert shape == (None, None, None, 'NOW()', None, None, None, None)
+    assert params == ('1700000000-1', "o'brien", 'db/changelog.xml', 12, '8:9a1b', 'sql, (x)', None)
+    assert changelog_row_key(columns, shape, params) == ('1700000000-1', "o'brien", 'db/changelog.xml')
+
+
+def test_parse_changelog_insert_unparsed():
+    assert parse_changelog_insert('INSERT INTO public.databasechangelog SELECT 1;') is None
+    assert parse_changelog_insert("INSERT INTO public.databasechangelog (ID, AUTHOR) VALUES ('1');") is None
+
+
+def test_changelog_row_key_needs_literal_key_columns():
+    insert = parse_changelog_insert("insert into APP.DATABASECHANGELOG (id, author, filename) values ('1', 'me', 'f')")
+    assert changelog_row_key(*insert[1:]) == ('1', 'me', 'f')
+
+    insert = parse_changelog_insert("INSERT INTO t (ID, AUTHOR, FILENAME) VALUES ('1', upper('me'), 'f');")
+    assert insert[2] == (None, "upper('me')", None)
+    assert changelog_row_key(*insert[1:]) is None
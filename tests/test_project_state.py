@@ -0,0 +1,20 @@
+import os
+
+from iliq.project_state import ProjectState
+
+
+def test_record_digest_is_saved(tmp_path):
+    (tmp_path / 'v1.sql').write_text('create view v1 as select 1;\n')
+    state = ProjectState(str(tmp_path / 'cache'), str(tmp_path))
+    os.makedirs(state.cache_path)
+    state.open()
+    state.digest('v1.sql')
+    state.save()
+
+    state.record_digest('v1.sql', 'recorded')
+    state.save()
+    state.close()
+
+    reopened = ProjectState(state.cache_path, str(tmp_path)).open()
+    assert reopened.digest('v1.sql') == 'recorded'
+    reopened.close()